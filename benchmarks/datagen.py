@@ -0,0 +1,144 @@
+"""
+Seeded synthetic data for benchmarks.
+
+`size` is the number of time entries to generate; unless a task count is
+given, tasks are created at a ratio of one per `ENTRIES_PER_TASK` entries. Entries form one continuous, mostly
+non-overlapping timeline going back from a fixed point in time, with the most
+recent entry left active.
+"""
+
+import datetime
+import os
+import random
+from collections.abc import Iterator
+from typing import Any
+
+from chorez import models
+from chorez.database import Database
+
+SIZES: dict[str, int] = {
+    "10k": 10_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+ENTRIES_PER_TASK = 10
+BATCH_SIZE = 10_000
+NOW = datetime.datetime(2025, 1, 1, 9, 0, 0)
+
+PRIORITY_WEIGHTS: dict[models.Priority, int] = {
+    models.Priority.CRITICAL: 2,
+    models.Priority.HIGH: 15,
+    models.Priority.MEDIUM: 50,
+    models.Priority.LOW: 25,
+    models.Priority.INSIGNIFICANT: 8,
+}
+DIFFICULTY_WEIGHTS: dict[models.Difficulty, int] = {
+    models.Difficulty.CHALLENGING: 5,
+    models.Difficulty.HARD: 20,
+    models.Difficulty.MEDIUM: 45,
+    models.Difficulty.EASY: 25,
+    models.Difficulty.BREEZE: 5,
+}
+TAGS: list[str] = [
+    "work",
+    "home",
+    "review",
+    "bug",
+    "feature",
+    "docs",
+    "meeting",
+    "ops",
+    "chore",
+    "research",
+    "finance",
+    "health",
+    "errand",
+    "garden",
+    "car",
+    "travel",
+]
+# Zipf-ish: a few tags are very common, most are rare.
+TAG_WEIGHTS: list[float] = [1 / (i + 1) for i in range(len(TAGS))]
+
+
+def dataset_path(data_dir: str, size: int, seed: int, num_tasks: int | None = None) -> str:
+    if num_tasks is None:
+        return os.path.join(data_dir, f"bench-{size}-{seed}.db")
+    return os.path.join(data_dir, f"bench-{size}-{num_tasks}t-{seed}.db")
+
+
+def generate(path: str, size: int, seed: int = 0, num_tasks: int | None = None) -> None:
+    """
+    Creates a database at `path` with `size` time entries and `num_tasks`
+    tasks. Existing files are overwritten.
+    """
+
+    if os.path.exists(path):
+        os.remove(path)
+    db = Database(path)
+    rng = random.Random(seed)
+    num_tasks = max(num_tasks or size // ENTRIES_PER_TASK, 1)
+
+    tasks = models.Task.__table__
+    time_entries = models.TimeEntry.__table__
+    with db.engine.begin() as conn:
+        _ = conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        for batch in _batched(_tasks(rng, num_tasks)):
+            _ = conn.execute(tasks.insert(), batch)  # pyright: ignore[reportAny]
+        for batch in _batched(_time_entries(rng, size, num_tasks)):
+            _ = conn.execute(time_entries.insert(), batch)  # pyright: ignore[reportAny]
+    db.close()
+
+
+def _tasks(rng: random.Random, n: int) -> Iterator[dict[str, Any]]:  # pyright: ignore[reportExplicitAny]
+    priorities = list(PRIORITY_WEIGHTS)
+    priority_weights = list(PRIORITY_WEIGHTS.values())
+    difficulties = list(DIFFICULTY_WEIGHTS)
+    difficulty_weights = list(DIFFICULTY_WEIGHTS.values())
+    for i in range(n):
+        num_tags = min(int(rng.expovariate(0.8)), 4)
+        tags = sorted(set(rng.choices(TAGS, TAG_WEIGHTS, k=num_tags)))
+        imported = rng.random() < 0.3
+        priority = rng.choices(priorities, priority_weights)[0]
+        difficulty = rng.choices(difficulties, difficulty_weights)[0]
+        yield {
+            "name": f"task {i} {rng.choice(TAGS)}",
+            "priority": priority,
+            "difficulty": difficulty,
+            "tags": tags,
+            "desc": "",
+            "is_imported": imported,
+            "source_id": str(i) if imported else None,
+            "source_url": "https://example.invalid/issues" if imported else None,
+            "created_at": NOW - datetime.timedelta(days=rng.expovariate(1 / 60)),
+        }
+
+
+def _time_entries(
+    rng: random.Random, n: int, num_tasks: int
+) -> Iterator[dict[str, Any]]:  # pyright: ignore[reportExplicitAny]
+    # Walk backwards from NOW. Recently created tasks get most of the time.
+    end: datetime.datetime | None = None
+    start = NOW
+    for i in range(n):
+        duration = datetime.timedelta(minutes=max(rng.lognormvariate(3.4, 0.8), 1))
+        gap = datetime.timedelta(minutes=rng.expovariate(1 / 20))
+        if i > 0:
+            end = start - gap
+        else:
+            end = None
+        start = (end or NOW) - duration
+        task_id = num_tasks - min(int(rng.expovariate(5 / num_tasks)), num_tasks - 1)
+        yield {"task_id": task_id, "start": start, "end": end}
+
+
+def _batched[T](items: Iterator[T]) -> Iterator[list[T]]:
+    batch: list[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,320 @@
+"""
+Benchmarks for the Database and CLI hot paths.
+
+    python benchmarks/run.py --size 10k --out results.json
+    python benchmarks/run.py --size 10k --baseline results.json
+    python benchmarks/run.py --size 1m --tasks 1m --only task_next
+
+Generated datasets are kept in --data-dir and reused between runs. With
+--baseline, the exit code is non-zero if any benchmark's median got slower
+than the baseline by more than --threshold.
+"""
+
+import contextlib
+import datetime
+import io
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, override
+
+import sqlalchemy as sa
+from tap import Tap
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import datagen  # noqa: E402  # pyright: ignore[reportImplicitRelativeImport]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[], object]
+    setup: Callable[[], object] | None = None
+    repeat: int | None = None
+    warmup: bool = True
+
+
+FULL_TABLE_REPEAT = 3
+"""
+Runs for benchmarks that read every task, which get slow at the larger sizes.
+They warm the cache themselves, so they also skip the untimed warmup run.
+"""
+
+
+class BenchArgs(Tap):
+    size: str = "10k"
+    tasks: str | None = None
+    seed: int = 0
+    repeat: int = 5
+    data_dir: str = ".bench-data"
+    out: str | None = None
+    baseline: str | None = None
+    threshold: float = 1.2
+    only: list[str] = []
+    skip: list[str] = []
+    regenerate: bool = False
+
+    @override
+    def configure(self) -> None:
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--size",
+            dest="size",
+            help=f"Number of time entries: {', '.join(datagen.SIZES)} or an integer",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--tasks",
+            dest="tasks",
+            default=None,
+            help=f"Number of tasks, if not one per {datagen.ENTRIES_PER_TASK} time entries",
+        )
+        self.add_argument("--seed", dest="seed", help="Data generator seed")  # pyright: ignore[reportUnknownMemberType]
+        self.add_argument("--repeat", "-r", dest="repeat", help="Runs per benchmark")  # pyright: ignore[reportUnknownMemberType]
+        self.add_argument("--data-dir", dest="data_dir", default=".bench-data")  # pyright: ignore[reportUnknownMemberType]
+        self.add_argument("--out", "-o", dest="out", default=None, help="Write results JSON here")  # pyright: ignore[reportUnknownMemberType]
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--baseline",
+            "-b",
+            dest="baseline",
+            default=None,
+            help="Results JSON to compare against",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--threshold",
+            dest="threshold",
+            help="Slowdown ratio (new/baseline median) counted as a regression",
+        )
+        self.add_argument("--only", nargs="+", dest="only", help="Benchmark name prefixes to run")  # pyright: ignore[reportUnknownMemberType]
+        self.add_argument("--skip", nargs="+", dest="skip", help="Benchmark name prefixes to skip")  # pyright: ignore[reportUnknownMemberType]
+        self.add_argument("--regenerate", action="store_true", dest="regenerate")  # pyright: ignore[reportUnknownMemberType]
+
+
+def main() -> int:
+    args = BenchArgs().parse_args()
+    size = _size(args.size)
+    num_tasks = _size(args.tasks) if args.tasks is not None else None
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    path = datagen.dataset_path(args.data_dir, size, args.seed, num_tasks)
+    if args.regenerate or not os.path.exists(path):
+        print(f"Generating {size} time entries into {path}...", file=sys.stderr)
+        start = time.perf_counter()
+        datagen.generate(path, size, args.seed, num_tasks)
+        print(f"\tdone in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    # Benchmarks write to the database, so every run gets a fresh copy and
+    # the cached dataset stays as generated.
+    fd, scratch = tempfile.mkstemp(suffix=".db", dir=args.data_dir)
+    os.close(fd)
+    shutil.copyfile(path, scratch)
+    try:
+        # Settings are read on import, so point them at the dataset first.
+        os.environ["CHOREZ_DB_SQLITE_DATABASE"] = scratch
+        from chorez.chorez import Chorez
+
+        chorez = Chorez()
+        results: dict[str, dict[str, Any]] = {}  # pyright: ignore[reportExplicitAny]
+        for bench in benchmarks(chorez):
+            if args.only and not any(bench.name.startswith(p) for p in args.only):
+                continue
+            if any(bench.name.startswith(p) for p in args.skip):
+                continue
+            timings = _time(bench, bench.repeat or args.repeat)
+            results[bench.name] = {
+                "runs": len(timings),
+                "min_s": min(timings),
+                "median_s": statistics.median(timings),
+                "mean_s": statistics.fmean(timings),
+            }
+            print(f"{bench.name:<40} {statistics.median(timings) * 1000:>10.2f} ms", file=sys.stderr)
+        chorez.db.close()
+    finally:
+        for leftover in (scratch, f"{scratch}-journal", f"{scratch}-wal", f"{scratch}-shm"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    report = {
+        "meta": {
+            "size": size,
+            "tasks": num_tasks,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "sqlalchemy": sa.__version__,
+            "sqlite": _sqlite_version(),
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+    if args.out is not None:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)  # pyright: ignore[reportAny]
+        return compare(baseline, report, args.threshold)  # pyright: ignore[reportAny]
+    return 0
+
+
+def benchmarks(chorez: Any) -> list[Benchmark]:  # pyright: ignore[reportExplicitAny, reportAny]
+    from chorez import models
+    from chorez.cli.task import Format, TaskNext, TaskShow
+    from chorez.cli.time import TimeActive
+    from chorez.settings import ScoringSettings, settings
+
+    db = chorez.db  # pyright: ignore[reportAny]
+    counter = itertools.count()
+    with db.engine.connect() as conn:  # pyright: ignore[reportAny]
+        max_id: int = conn.execute(sa.select(sa.func.max(models.Task.id))).scalar_one()
+    bench_task = models.Task(name="benchmark target", tags=["bench"])
+    db.save_task(bench_task)  # pyright: ignore[reportAny]
+
+    def save_task() -> None:
+        db.save_task(models.Task(name=f"bench save {next(counter)}", tags=["bench"]))  # pyright: ignore[reportAny]
+
+    def save_time_entry() -> None:
+        start = datagen.NOW + datetime.timedelta(days=1, seconds=next(counter))
+        entry = models.TimeEntry(task_id=bench_task.id, start=start, end=start)  # pyright: ignore[reportArgumentType]
+        db.save_time_entry(entry)  # pyright: ignore[reportAny]
+
+    def clear_setup() -> None:
+        for i in range(10):
+            db.save_task(models.Task(name=f"bench clear {i}", tags=[]))  # pyright: ignore[reportAny]
+
+    def clear_tasks() -> None:
+        db.clear_tasks("name LIKE 'bench clear %'")  # pyright: ignore[reportAny]
+
+    def cli(cmd: type[Any], argv: list[str]) -> Callable[[], None]:  # pyright: ignore[reportExplicitAny]
+        parsed = cmd().parse_args(argv)  # pyright: ignore[reportAny]
+
+        def run() -> None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                parsed.run(parsed, chorez)  # pyright: ignore[reportAny]
+
+        return run
+
+    def scored(run: Callable[[], None], weights: ScoringSettings) -> Callable[[], None]:
+        def wrapped() -> None:
+            saved = settings.scoring
+            settings.scoring = weights
+            try:
+                run()
+            finally:
+                settings.scoring = saved
+
+        return wrapped
+
+    benches = [
+        Benchmark("save_task", save_task, repeat=100),
+        Benchmark("save_time_entry", save_time_entry, repeat=100),
+        Benchmark(
+            "list_tasks",
+            lambda: db.list_tasks(),  # pyright: ignore[reportAny]
+            repeat=FULL_TABLE_REPEAT,
+            warmup=False,
+        ),
+        Benchmark("list_tasks.filter_id", lambda: db.list_tasks(f"id={max_id // 2}")),  # pyright: ignore[reportAny]
+        Benchmark(
+            "list_tasks.filter_priority",
+            lambda: db.list_tasks("priority = 'CRITICAL'"),  # pyright: ignore[reportAny]
+        ),
+        Benchmark(
+            "list_tasks.filter_tag",
+            lambda: db.list_tasks("tags LIKE '%\"finance\"%'"),  # pyright: ignore[reportAny]
+        ),
+        # Dominated by the commit, which is noisy, so take more samples.
+        Benchmark("clear_tasks", clear_tasks, setup=clear_setup, repeat=25),
+        Benchmark("time_active", cli(TimeActive, [])),
+        Benchmark("task_next", cli(TaskNext, [])),
+        Benchmark("task_next.k100", cli(TaskNext, ["-k", "100"])),
+        # Priority bands overlap, so more than the top band gets scored.
+        Benchmark(
+            "task_next.priority_weight1",
+            scored(cli(TaskNext, []), ScoringSettings(priority_weight=1.0)),
+        ),
+    ]
+    for fmt in Format:
+        benches.append(
+            Benchmark(
+                f"task_show.{fmt.value}",
+                cli(TaskShow, ["--format", fmt.value]),
+                repeat=FULL_TABLE_REPEAT,
+                warmup=False,
+            )
+        )
+        benches.append(
+            Benchmark(
+                f"task_show.{fmt.value}.filter_priority",
+                cli(TaskShow, ["--format", fmt.value, "--filter", "priority = 'CRITICAL'"]),
+            )
+        )
+    return benches
+
+
+def compare(
+    baseline: dict[str, Any],  # pyright: ignore[reportExplicitAny]
+    current: dict[str, Any],  # pyright: ignore[reportExplicitAny]
+    threshold: float,
+) -> int:
+    if baseline["meta"]["size"] != current["meta"]["size"]:
+        print("warning: baseline was run with a different --size", file=sys.stderr)
+    if baseline["meta"].get("tasks") != current["meta"]["tasks"]:
+        print("warning: baseline was run with a different --tasks", file=sys.stderr)
+
+    regressions = 0
+    print(f"{'benchmark':<40} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, result in current["results"].items():  # pyright: ignore[reportAny]
+        base = baseline["results"].get(name)  # pyright: ignore[reportAny]
+        if base is None:
+            print(f"{name:<40} {'-':>10} {result['median_s'] * 1000:>8.2f}ms {'new':>7}")
+            continue
+        ratio: float = result["median_s"] / base["median_s"] if base["median_s"] else 1.0  # pyright: ignore[reportAny]
+        flag = ""
+        if ratio > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(
+            f"{name:<40} {base['median_s'] * 1000:>8.2f}ms "
+            + f"{result['median_s'] * 1000:>8.2f}ms {ratio:>6.2f}x{flag}"
+        )
+    return 1 if regressions else 0
+
+
+def _time(bench: Benchmark, repeat: int) -> list[float]:
+    # One untimed run first, so compiled statements and the page cache are
+    # warm for every sample rather than just the later ones.
+    if bench.warmup:
+        if bench.setup is not None:
+            _ = bench.setup()
+        _ = bench.run()
+
+    timings: list[float] = []
+    for _ in range(repeat):
+        if bench.setup is not None:
+            _ = bench.setup()
+        start = time.perf_counter()
+        _ = bench.run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _size(value: str) -> int:
+    return datagen.SIZES.get(value.lower()) or int(value)
+
+
+def _sqlite_version() -> str:
+    import sqlite3
+
+    return sqlite3.sqlite_version
+
+
+if __name__ == "__main__":
+    sys.exit(main())
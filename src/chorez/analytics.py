@@ -0,0 +1,266 @@
+"""
+Vectorized time-entry statistics. Requires numpy (`pip install chorez[analytics]`).
+
+Rows are pulled from the cursor as (task_id, start, end) floats in chunks,
+with timestamps converted to seconds since the epoch by SQLite itself, so no
+ORM objects or Python datetimes are created per row. Timestamps are naive
+local time, so hour-of-day and weekday come straight from the seconds.
+"""
+
+import datetime
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import sqlalchemy as sa
+
+from chorez import models
+from chorez.database import Database
+from chorez.profiling import phases
+
+Floats = npt.NDArray[np.float64]
+Ints = npt.NDArray[np.int64]
+
+EPOCH = datetime.datetime(1970, 1, 1)
+HOUR = 3600.0
+DAY = 86400.0
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+PERCENTILES = (50.0, 90.0, 99.0)
+
+
+@dataclass
+class TaskDurations:
+    task_id: Ints
+    count: Ints
+    total: Floats
+    percentiles: dict[float, Floats]
+    """
+    Percentile -> per-task entry duration at that percentile, in seconds.
+    """
+
+
+@dataclass
+class TimeStats:
+    tasks: TaskDurations
+    heatmap: Floats
+    """
+    Seconds tracked per (weekday, hour of day), Monday first.
+    """
+    days: Ints
+    """
+    Consecutive days since the epoch, from the first to the last tracked day.
+    """
+    daily: Floats
+    rolling_7d: Floats
+
+    def top(self, n: int) -> Ints:
+        """
+        Indices into `tasks` of the `n` tasks with the most time tracked.
+        """
+
+        return np.argsort(-self.tasks.total, kind="stable")[:n]
+
+    def top_task_ids(self, n: int) -> list[int]:
+        return self.tasks.task_id[self.top(n)].tolist()
+
+    def to_dict(self) -> dict[str, Any]:  # pyright: ignore[reportExplicitAny]
+        return {
+            "tasks": [
+                {
+                    "task_id": int(self.tasks.task_id[i]),
+                    "count": int(self.tasks.count[i]),
+                    "total_seconds": float(self.tasks.total[i]),
+                    "percentiles": {
+                        f"p{q:g}": float(v[i])
+                        for q, v in self.tasks.percentiles.items()
+                    },
+                }
+                for i in range(len(self.tasks.task_id))
+            ],
+            "heatmap_seconds": {
+                day: [float(v) for v in row]
+                for day, row in zip(WEEKDAYS, self.heatmap)
+            },
+            "daily": [
+                {
+                    "date": _date(day).isoformat(),
+                    "seconds": float(daily),
+                    "rolling_7d_seconds": float(rolling),
+                }
+                for day, daily, rolling in zip(self.days, self.daily, self.rolling_7d)
+            ],
+        }
+
+
+def time_stats(
+    db: Database,
+    since: datetime.datetime | None = None,
+    chunk_size: int = 100_000,
+    percentiles: tuple[float, ...] = PERCENTILES,
+) -> TimeStats:
+    task_ids: list[Ints] = []
+    durations: list[Floats] = []
+    heatmap = np.zeros((7, 24), dtype=np.float64)
+    daily: dict[int, float] = {}
+
+    for task_id, start, end in _chunks(db, since, chunk_size):
+        task_ids.append(task_id)
+        durations.append(end - start)
+
+        hours, seconds = _split(start, end, HOUR)
+        hour_of_day = hours % 24
+        weekday = (hours // 24 + 3) % 7  # 1970-01-01 was a Thursday
+        np.add.at(heatmap, (weekday, hour_of_day), seconds)
+
+        days, seconds = _split(start, end, DAY)
+        unique_days, inverse = np.unique(days, return_inverse=True)
+        sums = np.bincount(inverse, weights=seconds)
+        for day, total in zip(unique_days.tolist(), sums.tolist()):
+            daily[day] = daily.get(day, 0.0) + total
+
+    tasks = _task_durations(
+        np.concatenate(task_ids) if task_ids else np.zeros(0, dtype=np.int64),
+        np.concatenate(durations) if durations else np.zeros(0, dtype=np.float64),
+        percentiles,
+    )
+
+    if daily:
+        first = min(daily)
+        days_range = np.arange(first, max(daily) + 1, dtype=np.int64)
+        daily_seconds = np.zeros(len(days_range), dtype=np.float64)
+        daily_seconds[np.fromiter(daily.keys(), np.int64) - first] = np.fromiter(
+            daily.values(), np.float64
+        )
+    else:
+        days_range = np.zeros(0, dtype=np.int64)
+        daily_seconds = np.zeros(0, dtype=np.float64)
+    cumulative = np.concatenate(([0.0], np.cumsum(daily_seconds)))
+    rolling = cumulative[1:] - cumulative[np.maximum(np.arange(len(daily_seconds)) - 6, 0)]
+
+    return TimeStats(tasks, heatmap, days_range, daily_seconds, rolling)
+
+
+def _chunks(
+    db: Database,
+    since: datetime.datetime | None,
+    chunk_size: int,
+) -> Iterator[tuple[Ints, Floats, Floats]]:
+    te = db.time_entries_source(since)
+    now = (datetime.datetime.now() - EPOCH).total_seconds()
+    start = _epoch_seconds(te.c.start)
+    end = sa.func.coalesce(_epoch_seconds(te.c.end), now)
+    stmt = sa.select(te.c.task_id, start, end)
+    if since is not None:
+        stmt = stmt.where(te.c.start >= since)
+
+    with db.engine.connect() as conn:
+        with phases.phase("query"):
+            result = conn.execution_options(stream_results=True).execute(stmt)
+        while True:
+            # Not around the yield, or the caller's time would count too.
+            with phases.phase("query"):
+                rows = result.fetchmany(chunk_size)
+            if not rows:
+                break
+            array = np.array(rows, dtype=np.float64)
+            start_s = array[:, 1]
+            yield (
+                array[:, 0].astype(np.int64),
+                start_s,
+                np.maximum(array[:, 2], start_s),
+            )
+
+
+def _epoch_seconds(col: Any) -> sa.ColumnElement[float]:  # pyright: ignore[reportExplicitAny, reportAny]
+    return (sa.func.julianday(col) - 2440587.5) * DAY
+
+
+def _split(start: Floats, end: Floats, width: float) -> tuple[Ints, Floats]:
+    """
+    Splits each [start, end) interval at multiples of `width`. Returns the bin
+    index and the seconds spent in it for every piece.
+    """
+
+    first = np.floor(start / width).astype(np.int64)
+    last = np.ceil(end / width).astype(np.int64) - 1
+    pieces = np.maximum(last - first + 1, 1)
+    owner = np.repeat(np.arange(len(start)), pieces)
+    offsets = np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    bins = first[owner] + offsets
+    lo = np.maximum(start[owner], bins * width)
+    hi = np.minimum(end[owner], (bins + 1) * width)
+    return bins, np.maximum(hi - lo, 0.0)
+
+
+def _task_durations(
+    task_id: Ints,
+    duration: Floats,
+    percentiles: tuple[float, ...],
+) -> TaskDurations:
+    """
+    Per-task counts, totals and percentiles (linear interpolation, like
+    numpy.percentile) without a Python loop over tasks.
+    """
+
+    order = np.lexsort((duration, task_id))
+    task_id = task_id[order]
+    duration = duration[order]
+    ids, first, count = np.unique(task_id, return_index=True, return_counts=True)
+    total = np.add.reduceat(duration, first) if len(duration) else np.zeros(0)
+
+    result: dict[float, Floats] = {}
+    for q in percentiles:
+        position = first + (count - 1) * (q / 100)
+        lo = np.floor(position).astype(np.int64)
+        hi = np.ceil(position).astype(np.int64)
+        frac = position - lo
+        result[q] = duration[lo] * (1 - frac) + duration[hi] * frac
+    return TaskDurations(ids, count, total, result)
+
+
+def _date(day: int | np.integer[Any]) -> datetime.date:  # pyright: ignore[reportExplicitAny]
+    return (EPOCH + datetime.timedelta(days=int(day))).date()
+
+
+def task_names(db: Database, task_ids: list[int]) -> dict[int, str]:
+    if not task_ids:
+        return {}
+    stmt = sa.select(models.Task.id, models.Task.name).where(
+        models.Task.id.in_(task_ids)
+    )
+    with db.engine.connect() as conn, phases.phase("query"):
+        rows = conn.execute(stmt).all()
+    return {row.id: row.name for row in rows}
+
+
+def format_text(stats: TimeStats, names: dict[int, str], top: int = 10) -> str:
+    lines: list[str] = []
+    order = stats.top(top)
+    lines.append(f"Top {len(order)} tasks by time tracked:")
+    for i in order:
+        task_id = int(stats.tasks.task_id[i])
+        pcts = " ".join(
+            f"p{q:g}={_hms(v[i])}" for q, v in stats.tasks.percentiles.items()
+        )
+        lines.append(
+            f"\tTask #{task_id} [{names.get(task_id, '?')}] "
+            + f"total={_hms(stats.tasks.total[i])} entries={stats.tasks.count[i]} {pcts}"
+        )
+
+    lines.append("Hours tracked by weekday and hour of day:")
+    lines.append("\t   " + "".join(f"{h:>6}" for h in range(24)))
+    for day, row in zip(WEEKDAYS, stats.heatmap / HOUR):
+        lines.append(f"\t{day} " + "".join(f"{v:>6.1f}" for v in row))
+
+    lines.append("Daily load (last 14 days):")
+    for day, daily, rolling in list(
+        zip(stats.days, stats.daily, stats.rolling_7d)
+    )[-14:]:
+        lines.append(f"\t{_date(day)} day={_hms(daily)} 7d={_hms(rolling)}")
+    return "\n".join(lines)
+
+
+def _hms(seconds: float | np.floating[Any]) -> datetime.timedelta:  # pyright: ignore[reportExplicitAny]
+    return datetime.timedelta(seconds=round(float(seconds)))
@@ -0,0 +1,288 @@
+"""
+Online backups using SQLite's backup API.
+
+The database is copied a few pages at a time, with a short sleep between
+steps during which no lock is held, so writers keep working while a backup
+runs. Every backup gets a sha256sum-style checksum file next to it.
+
+If an archive database is attached, it is backed up alongside, to the path
+given by `archive_path`, and restored together with the main database.
+"""
+
+import contextlib
+import datetime
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from typing import Any
+
+from chorez import models
+from chorez.database import Database
+
+CHUNK_SIZE = 1 << 20
+ARCHIVE_ATTEMPTS = 3
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def backup(
+    db: Database,
+    dest: str,
+    pages: int = 64,
+    sleep: float = 0.005,
+    compress: bool = False,
+    max_restarts: int = 8,
+) -> str:
+    """
+    Backs up `db` to `dest`, gzip-compressed if `compress` is set, and
+    writes the checksum to `dest`.sha256. Returns the hex digest.
+
+    SQLite restarts a stepwise backup whenever another connection writes to
+    the source. If that happens more than `max_restarts` times, the rest is
+    copied in one step, which briefly blocks writers.
+
+    The archive, if attached, is copied first. Archiving writes to both
+    databases in one transaction, so if the archive changed by the time the
+    main database is copied, both are copied again.
+    """
+
+    archive = db.attached_archive
+    source = db.engine.raw_connection()
+    try:
+        conn: sqlite3.Connection = source.driver_connection  # pyright: ignore[reportAssignmentType]
+        for _ in range(ARCHIVE_ATTEMPTS):
+            version = None
+            if archive is not None:
+                version = _data_version(conn, models.ARCHIVE_SCHEMA)
+                _ = _write(
+                    conn,
+                    models.ARCHIVE_SCHEMA,
+                    archive_path(dest),
+                    pages,
+                    sleep,
+                    compress,
+                    max_restarts,
+                )
+            digest = _write(conn, "main", dest, pages, sleep, compress, max_restarts)
+            if archive is None or _data_version(conn, models.ARCHIVE_SCHEMA) == version:
+                return digest
+    finally:
+        source.close()
+    raise ValueError(f"{archive} kept changing during the backup, try again later")
+
+
+def snapshot(
+    db: Database,
+    directory: str,
+    keep: int | None = None,
+    compress: bool = True,
+    **kwargs: Any,  # pyright: ignore[reportExplicitAny, reportAny]
+) -> str:
+    """
+    Backs up `db` into `directory` under a timestamped name and returns the
+    path. If `keep` is set, only the newest `keep` snapshots are kept.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(db.database))[0]
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    dest = os.path.join(directory, f"{stem}-{stamp}.db{'.gz' if compress else ''}")
+    _ = backup(db, dest, compress=compress, **kwargs)  # pyright: ignore[reportAny]
+
+    if keep is not None:
+        snapshots = sorted(
+            name
+            for name in os.listdir(directory)
+            if name.startswith(f"{stem}-")
+            and not name.endswith(".sha256")
+            and not _is_archive(name)
+        )
+        for name in snapshots[: max(len(snapshots) - keep, 0)]:
+            for path in (name, archive_path(name)):
+                for p in (path, f"{path}.sha256"):
+                    if os.path.exists(os.path.join(directory, p)):
+                        os.remove(os.path.join(directory, p))
+    return dest
+
+
+def restore(db: Database, src: str, verify: bool = True) -> None:
+    """
+    Replaces the contents of `db` with the backup at `src`, and its archive
+    with the archive backup next to it. The checksum files are checked if
+    present (and required if `verify` is set), and so is each backup's
+    integrity, before anything is written.
+    """
+
+    archive_src = archive_path(src)
+    has_archive = os.path.exists(archive_src)
+    if has_archive and db.archive is None:
+        raise ValueError(f"{src} comes with an archive backup, but no archive database is configured")
+    if not has_archive and db.attached_archive is not None:
+        raise ValueError(
+            f"{src} has no archive backup ({archive_src}), restoring it would leave "
+            + f"{db.attached_archive} out of sync"
+        )
+
+    with contextlib.ExitStack() as stack:
+        main = _open_backup(stack, src, verify)
+        if has_archive:
+            assert db.archive is not None
+            archived = _open_backup(stack, archive_src, verify)
+            target = sqlite3.connect(db.archive)
+            try:
+                archived.backup(target)
+            finally:
+                target.close()
+        target = db.engine.raw_connection()
+        try:
+            main.backup(target.driver_connection)  # pyright: ignore[reportArgumentType]
+        finally:
+            target.close()
+
+    if has_archive and db.attached_archive is None:
+        db.attach_archive()
+    else:
+        db.close()
+
+
+def archive_path(path: str) -> str:
+    """
+    Where the archive's backup goes for a backup at `path`, e.g.
+    backup.db.gz -> backup.archive.db.gz.
+    """
+
+    base, gz = (path[:-3], ".gz") if path.endswith(".gz") else (path, "")
+    root, ext = os.path.splitext(base)
+    return f"{root}.archive{ext}{gz}"
+
+
+def checksum(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _write(
+    source: sqlite3.Connection,
+    name: str,
+    dest: str,
+    pages: int,
+    sleep: float,
+    compress: bool,
+    max_restarts: int,
+) -> str:
+    """
+    Backs up database `name` of `source` to `dest` and writes its checksum
+    file. `dest` only ever holds a complete backup.
+    """
+
+    directory = os.path.dirname(os.path.abspath(dest))
+    fd, tmp = tempfile.mkstemp(suffix=".db", dir=directory)
+    os.close(fd)
+    gz_tmp: str | None = None
+    try:
+        _copy(source, name, tmp, pages, sleep, max_restarts)
+        if compress:
+            fd, gz_tmp = tempfile.mkstemp(suffix=".gz", dir=directory)
+            with (
+                open(tmp, "rb") as src,
+                os.fdopen(fd, "wb") as raw,
+                gzip.GzipFile(os.path.basename(dest), "wb", fileobj=raw) as out,
+            ):
+                shutil.copyfileobj(src, out, CHUNK_SIZE)
+            os.replace(gz_tmp, dest)
+        else:
+            os.replace(tmp, dest)
+    finally:
+        for path in (tmp, gz_tmp):
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+
+    digest = checksum(dest)
+    with open(f"{dest}.sha256", "w", encoding="utf-8") as f:
+        _ = f.write(f"{digest}  {os.path.basename(dest)}\n")
+    return digest
+
+
+def _copy(
+    source: sqlite3.Connection,
+    name: str,
+    dest: str,
+    pages: int,
+    sleep: float,
+    max_restarts: int,
+) -> None:
+    restarts = 0
+    last_remaining: int | None = None
+
+    def progress(status: int, remaining: int, total: int) -> None:  # pyright: ignore[reportUnusedParameter]
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > max_restarts:
+                raise _TooManyRestarts
+        last_remaining = remaining
+        if remaining and sleep > 0:
+            time.sleep(sleep)
+
+    target = sqlite3.connect(dest)
+    try:
+        try:
+            source.backup(target, pages=pages, progress=progress, name=name)
+        except _TooManyRestarts:
+            source.backup(target, name=name)
+    finally:
+        target.close()
+
+
+def _open_backup(
+    stack: contextlib.ExitStack, src: str, verify: bool
+) -> sqlite3.Connection:
+    """
+    Checks the checksum and integrity of the backup at `src` and returns a
+    read-only connection to it, decompressed into a temporary file if needed.
+    """
+
+    checksum_file = f"{src}.sha256"
+    if os.path.exists(checksum_file):
+        with open(checksum_file, encoding="utf-8") as f:
+            expected = f.read().split()[0]
+        if checksum(src) != expected:
+            raise ValueError(f"Checksum mismatch for {src}")
+    elif verify:
+        raise ValueError(f"Missing checksum file {checksum_file}")
+
+    path = src
+    if _is_gzip(src):
+        fd, path = tempfile.mkstemp(suffix=".db")
+        _ = stack.callback(os.remove, path)
+        with os.fdopen(fd, "wb") as out, gzip.open(src, "rb") as f:
+            shutil.copyfileobj(f, out, CHUNK_SIZE)
+
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    _ = stack.callback(conn.close)
+    result = conn.execute("PRAGMA integrity_check").fetchone()[0]  # pyright: ignore[reportAny]
+    if result != "ok":
+        raise ValueError(f"Backup {src} is corrupt: {result}")
+    return conn
+
+
+def _data_version(conn: sqlite3.Connection, schema: str) -> int:
+    return conn.execute(f"PRAGMA {schema}.data_version").fetchone()[0]  # pyright: ignore[reportAny]
+
+
+def _is_archive(name: str) -> bool:
+    return os.path.splitext(name.removesuffix(".gz"))[0].endswith(".archive")
+
+
+def _is_gzip(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+from dataclasses import dataclass
+from typing import Any, final
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@final
+class QueryCache:
+    """
+    LRU cache of query results, keyed on (statement, params).
+
+    The cache is bounded both by number of entries and by the total number of
+    rows held. Results larger than `max_rows` are never cached.
+
+    Validity is tracked with an opaque version token; whenever the token passed
+    to `validate` differs from the previous one, everything is dropped.
+    """
+
+    def __init__(self, max_entries: int = 128, max_rows: int = 10_000) -> None:
+        assert max_entries > 0
+        assert max_rows > 0
+        self.max_entries: int = max_entries
+        self.max_rows: int = max_rows
+        self.stats: CacheStats = CacheStats()
+        self._entries: OrderedDict[Hashable, Sequence[Any]] = OrderedDict()  # pyright: ignore[reportExplicitAny]
+        self._rows: int = 0
+        self._version: Hashable = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def validate(self, version: Hashable) -> None:
+        if version != self._version:
+            self._version = version
+            self.clear()
+
+    def clear(self) -> None:
+        if self._entries:
+            self.stats.invalidations += 1
+        self._entries.clear()
+        self._rows = 0
+
+    def get(self, key: Hashable) -> Sequence[Any] | None:  # pyright: ignore[reportExplicitAny]
+        result = self._entries.get(key)
+        if result is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return result
+
+    def put(self, key: Hashable, result: Sequence[Any]) -> None:  # pyright: ignore[reportExplicitAny]
+        if len(result) > self.max_rows:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._rows -= len(old)
+        self._entries[key] = result
+        self._rows += len(result)
+        while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+            _, evicted = self._entries.popitem(last=False)
+            self._rows -= len(evicted)
+            self.stats.evictions += 1
+
+    def report(self) -> str:
+        stats = self.stats
+        return (
+            f"Cache: {stats.hits} hits, {stats.misses} misses "
+            + f"({stats.hit_rate * 100:.1f}% hit rate), {stats.evictions} evictions, "
+            + f"{stats.invalidations} invalidations, "
+            + f"{len(self._entries)} entries holding {self._rows} rows"
+        )
@@ -6,5 +6,14 @@ from chorez.settings import settings
 
 @final
 class Chorez:
-    def __init__(self) -> None:
-        self.db = Database(settings.database.sqlite.database)
+    def __init__(self, instrument: bool = False) -> None:
+        sqlite = settings.database.sqlite
+        self.db = Database(
+            sqlite.database,
+            cache_size=sqlite.cache_size,
+            cache_max_rows=sqlite.cache_max_rows,
+            instrument=instrument,
+            slow_query_threshold_ms=settings.database.slow_query_threshold_ms,
+            prevent_overlaps=settings.database.prevent_time_overlaps,
+            archive=sqlite.archive_database,
+        )
@@ -0,0 +1,163 @@
+import sys
+from typing import Self, override
+
+import dateparser
+from tap import Tap
+
+from chorez import backup
+from chorez.chorez import Chorez
+from chorez.cli.constants import EXIT_FAILURE, EXIT_SUCCESS
+from chorez.cli.time import dateparser_settings
+from chorez.settings import settings
+
+
+class DbArchive(Tap):
+    before: str  # pyright: ignore[reportUninitializedInstanceVariable]
+    batch_size: int = 5_000
+    vacuum: bool = False
+
+    @override
+    def configure(self) -> None:
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--before",
+            "-b",
+            dest="before",
+            help="Archive time entries that ended before this date/time",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--batch-size",
+            dest="batch_size",
+            default=5_000,
+            help="Number of entries to move per transaction",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--vacuum",
+            action="store_true",
+            dest="vacuum",
+            help="VACUUM the main database afterwards to give the space back",
+        )
+
+        self.set_defaults(run=self.run)
+
+    def run(self, args: Self, chorez: Chorez) -> int:
+        before = dateparser.parse(args.before, settings=dateparser_settings())  # pyright: ignore[reportAny]
+        if before is None:
+            print(f"Invalid before date/time {args.before!r}", file=sys.stderr)
+            return EXIT_FAILURE
+        before = before.replace(tzinfo=None)
+
+        moved = chorez.db.archive_time_entries(before, batch_size=args.batch_size)
+        print(f"Archived {moved} time entries to {chorez.db.archive}")
+        if args.vacuum:
+            chorez.db.vacuum()
+        return EXIT_SUCCESS
+
+
+class DbBackup(Tap):
+    dest: str  # pyright: ignore[reportUninitializedInstanceVariable]
+    pages: int = 64
+    sleep: float = 0.005
+    compress: bool = False
+
+    @override
+    def configure(self) -> None:
+        self.add_argument("dest", help="File to write the backup to")  # pyright: ignore[reportUnknownMemberType]
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--pages",
+            dest="pages",
+            default=64,
+            help="Pages to copy per step",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--sleep",
+            dest="sleep",
+            default=0.005,
+            help="Seconds to pause between steps, letting writers in",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--compress",
+            "-z",
+            action="store_true",
+            dest="compress",
+            help="gzip the backup",
+        )
+
+        self.set_defaults(run=self.run)
+
+    def run(self, args: Self, chorez: Chorez) -> int:
+        digest = backup.backup(
+            chorez.db,
+            args.dest,
+            pages=args.pages,
+            sleep=args.sleep,
+            compress=args.compress,
+        )
+        print(f"Backed up {chorez.db.database} to {args.dest} (sha256 {digest})")
+        if chorez.db.attached_archive is not None:
+            print(f"Backed up {chorez.db.attached_archive} to {backup.archive_path(args.dest)}")
+        return EXIT_SUCCESS
+
+
+class DbSnapshot(Tap):
+    dir: str | None = None
+    keep: int | None = None
+
+    @override
+    def configure(self) -> None:
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--dir",
+            dest="dir",
+            default=None,
+            help="Directory to put the snapshot in, defaults to the snapshot_dir setting",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--keep",
+            dest="keep",
+            default=None,
+            help="Only keep this many of the newest snapshots",
+        )
+
+        self.set_defaults(run=self.run)
+
+    def run(self, args: Self, chorez: Chorez) -> int:
+        directory = args.dir or settings.database.sqlite.snapshot_dir
+        path = backup.snapshot(chorez.db, directory, keep=args.keep)
+        print(f"Saved snapshot {path}")
+        return EXIT_SUCCESS
+
+
+class DbRestore(Tap):
+    src: str  # pyright: ignore[reportUninitializedInstanceVariable]
+    no_verify: bool = False
+
+    @override
+    def configure(self) -> None:
+        self.add_argument("src", help="Backup file to restore")  # pyright: ignore[reportUnknownMemberType]
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--no-verify",
+            action="store_true",
+            dest="no_verify",
+            default=False,
+            help="Allow restoring a backup without a checksum file",
+        )
+
+        self.set_defaults(run=self.run)
+
+    def run(self, args: Self, chorez: Chorez) -> int:
+        try:
+            backup.restore(chorez.db, args.src, verify=not args.no_verify)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return EXIT_FAILURE
+        print(f"Restored {chorez.db.database} from {args.src}")
+        return EXIT_SUCCESS
+
+
+class DbCLI(Tap):
+    @override
+    def configure(self) -> None:
+        self.add_subparsers(dest="subcommand", required=True, help="db subcommands")  # pyright: ignore[reportUnknownMemberType]
+        self.add_subparser("archive", DbArchive)  # pyright: ignore[reportUnknownMemberType]
+        self.add_subparser("backup", DbBackup)  # pyright: ignore[reportUnknownMemberType]
+        self.add_subparser("snapshot", DbSnapshot)  # pyright: ignore[reportUnknownMemberType]
+        self.add_subparser("restore", DbRestore)  # pyright: ignore[reportUnknownMemberType]
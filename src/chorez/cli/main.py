@@ -1,17 +1,48 @@
 import sys
 
-from chorez.chorez import Chorez
-from chorez.cli.root import RootCLI
+from chorez.profiling import phases
 
 
 def main() -> None:
     args = sys.argv[1:]
-    chorez = Chorez()
+    if args[:1] == ["__complete"]:
+        # Shell completion has to be fast, so skip everything below.
+        from chorez.completion import complete
+
+        sys.exit(complete(args[1:]))
+
+    with phases.phase("imports"):
+        from chorez.chorez import Chorez
+        from chorez.cli.constants import EXIT_SUCCESS
+        from chorez.cli.root import RootCLI
+
     parsed = RootCLI().parse_args(args)
-    if hasattr(parsed, "run"):
-        sys.exit(parsed.run(parsed, chorez))  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType, reportUnknownArgumentType]
-    else:
+    if not hasattr(parsed, "run"):
         print(parsed)
+        return
+
+    profiler = None
+    if parsed.profile_out is not None:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    chorez = Chorez(instrument=parsed.profile)
+    with phases.phase("formatting"):
+        code: int = parsed.run(parsed, chorez)  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType, reportUnknownVariableType]
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(parsed.profile_out)
+    if parsed.profile:
+        print(phases.report(), file=sys.stderr)
+        if chorez.db.instrumentation is not None:
+            print(chorez.db.instrumentation.report(), file=sys.stderr)
+        if chorez.db.cache is not None:
+            print(chorez.db.cache.report(), file=sys.stderr)
+
+    sys.exit(code if code is not None else EXIT_SUCCESS)  # pyright: ignore[reportUnnecessaryComparison]
 
 
 if __name__ == "__main__":
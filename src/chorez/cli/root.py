@@ -2,13 +2,30 @@ from typing import override
 
 from tap import Tap
 
+from chorez.cli.db import DbCLI
 from chorez.cli.task import TaskCLI
 from chorez.cli.time import TimeCLI
 
 
 class RootCLI(Tap):
+    profile: bool = False
+    profile_out: str | None = None
+
     @override
     def configure(self) -> None:
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--profile",
+            action="store_true",
+            dest="profile",
+            help="Print a phase and query timing breakdown to stderr at exit",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--profile-out",
+            dest="profile_out",
+            default=None,
+            help="Dump cProfile stats (pstats format) to this file",
+        )
         self.add_subparsers(dest="cmd", required=True, help="subcommands")  # pyright: ignore[reportUnknownMemberType]
         self.add_subparser("task", TaskCLI)  # pyright: ignore[reportUnknownMemberType]
         self.add_subparser("time", TimeCLI)  # pyright: ignore[reportUnknownMemberType]
+        self.add_subparser("db", DbCLI)  # pyright: ignore[reportUnknownMemberType]
@@ -1,4 +1,3 @@
-import itertools
 import json
 import sys
 from enum import Enum
@@ -7,9 +6,10 @@ from typing import Self, override
 import yaml
 from tap import Tap
 
-from chorez import models
+from chorez import models, scoring
 from chorez.chorez import Chorez
 from chorez.cli.constants import EXIT_FAILURE, EXIT_SUCCESS
+from chorez.settings import settings
 
 
 class Format(str, Enum):
@@ -35,28 +35,25 @@ class TaskShow(Tap):
         self.set_defaults(run=self.run)
 
     def run(self, args: Self, chorez: Chorez) -> int:
-        tasks = chorez.db.list_tasks(args.filter)
         match args.format:
-            case Format.PRETTY:
-                print(f"Found {len(tasks)} tasks:")
-                by_priority = itertools.groupby(tasks, lambda e: e.priority)
-                for prio, group in by_priority:
-                    group = list(group)
-                    print(f"\tPrio {prio.value} (count={len(group)})")
-                    for task in group:
+            case Format.PRETTY | Format.PRETTY_WITH_TIMES:
+                counts = dict(chorez.db.count_tasks_by_priority(args.filter))
+                print(f"Found {sum(counts.values())} tasks:")
+                prio: models.Priority | None = None
+                for task in chorez.db.iter_tasks_by_priority(args.filter):
+                    if task.priority != prio:
+                        prio = task.priority
+                        print(f"\tPrio {prio.value} (count={counts.get(prio, 0)})")
+                    if args.format == Format.PRETTY:
                         print(f"\t\t{task.pretty()}")
-            case Format.PRETTY_WITH_TIMES:
-                print(f"Found {len(tasks)} tasks:")
-                by_priority = itertools.groupby(tasks, lambda e: e.priority)
-                for prio, group in by_priority:
-                    group = list(group)
-                    print(f"\tPrio {prio.value} (count={len(group)})")
-                    for task in group:
+                    else:
                         print(f"{task.pretty_with_times(indent=2)}")
             case Format.JSON:
+                tasks = chorez.db.list_tasks(args.filter)
                 task_dicts = [x.toDict() for x in tasks]
                 print(json.dumps(task_dicts, sort_keys=True))
             case Format.YAML:
+                tasks = chorez.db.list_tasks(args.filter)
                 task_dicts = [x.toDict() for x in tasks]
                 print(yaml.dump(task_dicts, sort_keys=True))
         return EXIT_SUCCESS
@@ -236,6 +233,26 @@ class TaskRm(Tap):
         return EXIT_SUCCESS
 
 
+class TaskNext(Tap):
+    k: int = 10
+    filter: str = ""
+
+    @override
+    def configure(self) -> None:
+        self.add_argument("-k", dest="k", help="Number of tasks to suggest")  # pyright: ignore[reportUnknownMemberType]
+        self.add_argument("--filter", dest="filter", help="sqlalchemy where clause")  # pyright: ignore[reportUnknownMemberType]
+        self.set_defaults(run=self.run)
+
+    def run(self, args: Self, chorez: Chorez) -> int:
+        tasks = scoring.next_tasks(chorez.db, args.k, settings.scoring, args.filter)
+        if not tasks:
+            print("No tasks found", file=sys.stderr)
+            return EXIT_FAILURE
+        for task in tasks:
+            print(task.pretty())
+        return EXIT_SUCCESS
+
+
 class TaskCLI(Tap):
     @override
     def configure(self) -> None:
@@ -244,3 +261,4 @@ class TaskCLI(Tap):
         self.add_subparser("add", TaskAdd)  # pyright: ignore[reportUnknownMemberType]
         self.add_subparser("edit", TaskEdit)  # pyright: ignore[reportUnknownMemberType]
         self.add_subparser("rm", TaskRm)  # pyright: ignore[reportUnknownMemberType]
+        self.add_subparser("next", TaskNext)  # pyright: ignore[reportUnknownMemberType]
@@ -1,5 +1,9 @@
+import json
 import sys
-from datetime import datetime
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from enum import Enum
+from time import sleep
 from typing import Any, Self, override
 
 import dateparser
@@ -43,6 +47,7 @@ class TimeStart(Tap):
         if start is None:
             print(f"Invalid start date/time {args.start!r}", file=sys.stderr)
             return EXIT_FAILURE
+        start = start.replace(tzinfo=None)
 
         end: datetime | None = None
         if args.end is not None:
@@ -50,25 +55,243 @@ class TimeStart(Tap):
             if end is None:
                 print(f"Invalid end date/time {args.start!r}", file=sys.stderr)
                 return EXIT_FAILURE
+            end = end.replace(tzinfo=None)
 
         time_entry = models.TimeEntry(task_id=args.task_id, start=start, end=end)
-        chorez.db.save_time_entry(time_entry)
+        try:
+            chorez.db.save_time_entry(time_entry)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return EXIT_FAILURE
 
         return EXIT_SUCCESS
 
 
+class ActiveFormat(str, Enum):
+    PRETTY = "pretty"
+    LINE = "line"
+    JSON = "json"
+
+
 class TimeActive(Tap):
+    format: ActiveFormat = ActiveFormat.PRETTY
+    watch: bool = False
+    interval: float = 1.0
+    ticks: int | None = None
+
     @override
     def configure(self) -> None:
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--format",
+            choices=[m for m in ActiveFormat],
+            dest="format",
+            help=f"Format to output as: {', '.join(m.value for m in ActiveFormat)}. "
+            + "line and json print a single line, meant for status bars",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--watch",
+            "-w",
+            action="store_true",
+            dest="watch",
+            help="Keep running and print the active entries every --interval seconds",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--interval",
+            dest="interval",
+            default=1.0,
+            help="Seconds between updates in --watch mode",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--ticks",
+            dest="ticks",
+            default=None,
+            help="Stop --watch mode after this many updates",
+        )
+
         self.set_defaults(run=self.run)
 
-    def run(self, args: Self, chorez: Chorez) -> int:  # pyright: ignore[reportUnusedParameter]
-        time_entries = chorez.db.list_time_entries(
-            filter="end IS NULL",
+    def run(self, args: Self, chorez: Chorez) -> int:
+        if not args.watch:
+            output = _format_active(_active_entries(chorez), args.format)
+            if output:
+                print(output)
+            return EXIT_SUCCESS
+
+        # Re-query only when another connection has committed since the last
+        # tick; otherwise just recompute the elapsed durations.
+        version: int | None = None
+        entries: Sequence[models.TimeEntry] = []
+        tick = 0
+        try:
+            while args.ticks is None or tick < args.ticks:
+                current = chorez.db.data_version()
+                if current != version:
+                    version = current
+                    entries = _active_entries(chorez)
+                if args.format == ActiveFormat.PRETTY and sys.stdout.isatty():
+                    print("\033[H\033[J", end="")
+                print(_format_active(entries, args.format), flush=True)
+                tick += 1
+                if args.ticks is None or tick < args.ticks:
+                    sleep(args.interval)
+        except KeyboardInterrupt:
+            pass
+        return EXIT_SUCCESS
+
+
+def _active_entries(chorez: Chorez) -> Sequence[models.TimeEntry]:
+    return chorez.db.list_time_entries(
+        filter="end IS NULL",
+        include_archive=False,
+    )
+
+
+def _format_active(entries: Sequence[models.TimeEntry], format: ActiveFormat) -> str:
+    match format:
+        case ActiveFormat.PRETTY:
+            return "\n".join(entry.pretty_with_task() for entry in entries)
+        case ActiveFormat.LINE:
+            if not entries:
+                return "idle"
+            return " | ".join(
+                f"#{entry.task_id} {entry.task.name if entry.task else '?'} "
+                + f"{timedelta(seconds=int(entry.duration().total_seconds()))}"
+                for entry in entries
+            )
+        case ActiveFormat.JSON:
+            return json.dumps(
+                [
+                    {
+                        "id": entry.id,
+                        "task_id": entry.task_id,
+                        "task": entry.task.name if entry.task else None,
+                        "start": entry.start.isoformat(),
+                        "elapsed_seconds": int(entry.duration().total_seconds()),
+                    }
+                    for entry in entries
+                ]
+            )
+
+
+class TimeCheck(Tap):
+    fix: bool = False
+    min_gap: float = 1
+    max_gap: float = 60
+
+    @override
+    def configure(self) -> None:
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--fix",
+            action="store_true",
+            dest="fix",
+            help="End the earlier of two overlapping entries when the later one starts, "
+            + "if the later one runs at least as long",
         )
-        for entry in time_entries:
-            print(entry.pretty_with_task())
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--min-gap",
+            dest="min_gap",
+            default=1,
+            help="Shortest gap between entries to report, in minutes",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--max-gap",
+            dest="max_gap",
+            default=60,
+            help="Longest gap between entries to report, in minutes",
+        )
+
+        self.set_defaults(run=self.run)
+
+    def run(self, args: Self, chorez: Chorez) -> int:
+        overlaps = chorez.db.find_overlaps()
+        gaps = chorez.db.find_gaps(
+            timedelta(minutes=args.min_gap),
+            timedelta(minutes=args.max_gap),
+        )
+
+        print(f"Found {len(overlaps)} overlaps:")
+        for overlap in overlaps:
+            print(f"\t{overlap.pretty()}")
+        print(f"Found {len(gaps)} gaps:")
+        for gap in gaps:
+            print(f"\t{gap.pretty()}")
+
+        if overlaps and args.fix:
+            fixed = chorez.db.fix_overlaps()
+            print(f"Fixed {len(fixed)} time entries:")
+            for overlap in fixed:
+                dropped = overlap.end - overlap.start if overlap.end else "active time"
+                print(
+                    f"\tEnded #{overlap.first_id} at {overlap.start}, "
+                    + f"dropping {dropped} also tracked by #{overlap.second_id}"
+                )
+            overlaps = chorez.db.find_overlaps()
+            if overlaps:
+                print(f"{len(overlaps)} entries lie within another one and need fixing by hand:")
+                for overlap in overlaps:
+                    print(f"\t{overlap.pretty()}")
+        return EXIT_FAILURE if overlaps else EXIT_SUCCESS
+
+
+class StatsFormat(str, Enum):
+    TEXT = "text"
+    JSON = "json"
+
+
+class TimeStats(Tap):
+    format: StatsFormat = StatsFormat.TEXT
+    since: str | None = None
+    top: int = 10
+
+    @override
+    def configure(self) -> None:
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--format",
+            choices=[m for m in StatsFormat],
+            dest="format",
+            help=f"Format to output as: {', '.join(m.value for m in StatsFormat)}",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--since",
+            "-s",
+            dest="since",
+            default=None,
+            help="Only include entries starting at or after this date/time",
+        )
+        self.add_argument(  # pyright: ignore[reportUnknownMemberType]
+            "--top",
+            dest="top",
+            default=10,
+            help="Number of tasks to show in text output",
+        )
+
+        self.set_defaults(run=self.run)
+
+    def run(self, args: Self, chorez: Chorez) -> int:
+        try:
+            from chorez import analytics
+        except ImportError:
+            print(
+                "time stats requires numpy, install chorez[analytics]",
+                file=sys.stderr,
+            )
+            return EXIT_FAILURE
+
+        since: datetime | None = None
+        if args.since is not None:
+            since = dateparser.parse(args.since, settings=dateparser_settings())  # pyright: ignore[reportAny]
+            if since is None:
+                print(f"Invalid since date/time {args.since!r}", file=sys.stderr)
+                return EXIT_FAILURE
+            since = since.replace(tzinfo=None)
 
+        stats = analytics.time_stats(chorez.db, since=since)
+        match args.format:
+            case StatsFormat.TEXT:
+                names = analytics.task_names(chorez.db, stats.top_task_ids(args.top))
+                print(analytics.format_text(stats, names, args.top))
+            case StatsFormat.JSON:
+                print(json.dumps(stats.to_dict(), sort_keys=True))
         return EXIT_SUCCESS
 
 
@@ -78,3 +301,5 @@ class TimeCLI(Tap):
         self.add_subparsers(dest="subcommand", required=True, help="time subcommands")  # pyright: ignore[reportUnknownMemberType]
         self.add_subparser("start", TimeStart)  # pyright: ignore[reportUnknownMemberType]
         self.add_subparser("active", TimeActive)  # pyright: ignore[reportUnknownMemberType]
+        self.add_subparser("check", TimeCheck)  # pyright: ignore[reportUnknownMemberType]
+        self.add_subparser("stats", TimeStats)  # pyright: ignore[reportUnknownMemberType]
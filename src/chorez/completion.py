@@ -0,0 +1,280 @@
+"""
+Shell completion for task IDs, task names and tags.
+
+This module is imported by `chorez __complete` before anything else, so it
+must only use the standard library: no Tap, pydantic, SQLAlchemy or ORM models.
+Each completion is one or a few indexed queries on a read-only connection.
+
+    chorez __complete task edit --id 12     -> task IDs starting with 12
+    chorez __complete time start ''         -> most recent task IDs
+    chorez __complete task add --tags wo    -> tags starting with wo
+    chorez __complete --shell bash          -> bash completion script
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from collections.abc import Iterable
+from typing import TextIO
+
+LIMIT = 50
+
+BASH_SCRIPT = """\
+_chorez() {
+    local IFS=$'\\n'
+    COMPREPLY=($(chorez __complete "${COMP_WORDS[@]:1:COMP_CWORD}" 2>/dev/null))
+}
+complete -o default -F _chorez chorez
+"""
+
+_ID_OPTIONS = ("--id", "-i")
+_NAME_OPTIONS = ("--name", "-n")
+_TAG_OPTIONS = ("--tags", "-t")
+_VALUE_OPTIONS = (
+    "--start",
+    "-s",
+    "--end",
+    "-e",
+    "--desc",
+    "-D",
+    "--priority",
+    "-p",
+    "--difficulty",
+    "-d",
+    "--format",
+    "--filter",
+)
+_SHORT_OPTIONS = {
+    o
+    for o in (*_ID_OPTIONS, *_NAME_OPTIONS, *_TAG_OPTIONS, *_VALUE_OPTIONS)
+    if not o.startswith("--")
+}
+
+
+def complete(words: list[str], out: TextIO = sys.stdout) -> int:
+    if words[:1] == ["--shell"]:
+        if words[1:] != ["bash"]:
+            print("Only bash is supported", file=sys.stderr)
+            return 1
+        _ = out.write(BASH_SCRIPT)
+        return 0
+    if not words:
+        return 0
+
+    *context, prefix = words
+    path = database_path()
+    if not os.path.exists(path):
+        return 0
+
+    kind = _kind(_strip_global_options(context))
+    if kind is None:
+        return 0
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        match kind:
+            case "id":
+                candidates = task_ids(conn, prefix)
+            case "name":
+                candidates = task_names(conn, prefix)
+            case _:
+                sign = prefix[:1] if prefix[:1] in ("+", "-") else ""
+                candidates = (sign + t for t in tags(conn, path, prefix[len(sign) :]))
+        for candidate in candidates:
+            _ = out.write(f"{candidate}\n")
+    finally:
+        conn.close()
+    return 0
+
+
+def database_path() -> str:
+    """
+    Resolves the database path like `SqliteDatabaseSettings` does, without
+    importing pydantic: environment first, then `.env`, then the default.
+    """
+
+    key = "CHOREZ_DB_SQLITE_DATABASE"
+    if key in os.environ:
+        return os.environ[key]
+    try:
+        with open(".env", encoding="utf-8") as f:
+            for line in f:
+                name, sep, value = line.strip().partition("=")
+                if sep and name.strip() == key:
+                    return value.strip().strip("'\"")
+    except OSError:
+        pass
+    return "sqlite.db"
+
+
+def task_ids(conn: sqlite3.Connection, prefix: str, limit: int = LIMIT) -> list[int]:
+    """
+    IDs whose decimal form starts with `prefix`, shortest first. Instead of
+    casting every ID to text, each length is one rowid range lookup:
+    12, 120-129, 1200-1299, ...
+    """
+
+    if not prefix:
+        return [
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM tasks ORDER BY id DESC LIMIT ?", (limit,)
+            )
+        ]
+    if not prefix.isdigit() or prefix.startswith("0"):
+        # No ID starts with 0, and 0 * 10 would never leave the loop below.
+        return []
+
+    max_id: int | None = conn.execute("SELECT max(id) FROM tasks").fetchone()[0]
+    if max_id is None:
+        return []
+    ids: list[int] = []
+    lo = hi = int(prefix)
+    while lo <= max_id and len(ids) < limit:
+        ids.extend(
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM tasks WHERE id BETWEEN ? AND ? ORDER BY id LIMIT ?",
+                (lo, hi, limit - len(ids)),
+            )
+        )
+        lo, hi = lo * 10, hi * 10 + 9
+    return ids
+
+
+def task_names(conn: sqlite3.Connection, prefix: str, limit: int = LIMIT) -> list[str]:
+    """
+    Names starting with `prefix`, as a range scan on the (name, id) index.
+    """
+
+    if not prefix:
+        rows = conn.execute("SELECT name FROM tasks ORDER BY name LIMIT ?", (limit,))
+    else:
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        rows = conn.execute(
+            "SELECT name FROM tasks WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+            (prefix, upper, limit),
+        )
+    return [row[0] for row in rows]
+
+
+def tags(
+    conn: sqlite3.Connection,
+    path: str,
+    prefix: str,
+    limit: int = LIMIT,
+) -> list[str]:
+    """
+    Tags starting with `prefix`. Tags live in a JSON column, so the distinct
+    set is kept in a sidecar file next to the database and only rebuilt when
+    the database has changed since.
+    """
+
+    return [t for t in _tag_cache(conn, path) if t.startswith(prefix)][:limit]
+
+
+def _tag_cache(conn: sqlite3.Connection, path: str) -> list[str]:
+    cache_path = f"{path}.tags"
+    version = _file_version(path)
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached: dict[str, object] = json.load(f)
+        if cached.get("version") == version:
+            return cached["tags"]  # pyright: ignore[reportReturnType]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    all_tags = [
+        row[0]
+        for row in conn.execute(
+            "SELECT DISTINCT value FROM tasks, json_each(tasks.tags) ORDER BY value"
+        )
+    ]
+    try:
+        tmp = f"{cache_path}.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "tags": all_tags}, f)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
+    return all_tags
+
+
+def _file_version(path: str) -> str:
+    """
+    Identifies the database contents across processes. `PRAGMA data_version`
+    is only comparable within one connection, so this uses the file change
+    counter from the database header, which SQLite bumps on every commit in
+    rollback journal mode, plus the size and mtime of the file and its WAL.
+    """
+
+    with open(path, "rb") as f:
+        header = f.read(28)
+    counter = int.from_bytes(header[24:28], "big") if len(header) == 28 else 0
+    parts = [str(counter)]
+    for p in (path, f"{path}-wal"):
+        try:
+            st = os.stat(p)
+            parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            parts.append("-")
+    return "/".join(parts)
+
+
+def _strip_global_options(words: list[str]) -> list[str]:
+    i = 0
+    while i < len(words) and words[i].startswith("-"):
+        i += 2 if words[i] == "--profile-out" else 1
+    return words[i:]
+
+
+def _kind(context: list[str]) -> str | None:
+    if not context:
+        return None
+    prev = context[-1]
+    if prev in _ID_OPTIONS:
+        return "id"
+    if prev in _NAME_OPTIONS:
+        return "name"
+    if _in_tags(context):
+        return "tag"
+    if prev in _VALUE_OPTIONS:
+        return None
+
+    positionals = _positionals(context[2:])
+    match context[:2]:
+        case ["time", "start"] if not positionals:
+            return "id"
+        case ["task", "edit"] if not positionals:
+            return "name"
+        case _:
+            return None
+
+
+def _in_tags(context: Iterable[str]) -> bool:
+    """
+    --tags takes one or more values, so we're completing a tag if the last
+    option given was --tags.
+    """
+
+    in_tags = False
+    for word in context:
+        if word in _TAG_OPTIONS:
+            in_tags = True
+        elif word.startswith("--") or word in _SHORT_OPTIONS:
+            # Not just startswith("-"): "-tag" removes a tag in task edit.
+            in_tags = False
+    return in_tags
+
+
+def _positionals(words: list[str]) -> list[str]:
+    positionals: list[str] = []
+    skip = False
+    for word in words:
+        if skip:
+            skip = False
+        elif word in _VALUE_OPTIONS or word in _ID_OPTIONS or word in _NAME_OPTIONS:
+            skip = True
+        elif not word.startswith("-"):
+            positionals.append(word)
+    return positionals
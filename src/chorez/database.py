@@ -1,32 +1,208 @@
-from collections.abc import Sequence
+import datetime
+import os
+from collections.abc import Iterator, Sequence
 from typing import Any, final
 
 import sqlalchemy as sa
 from sqlalchemy import event
-from sqlalchemy.orm import InstrumentedAttribute, sessionmaker
+from sqlalchemy.orm import InstrumentedAttribute, Session, aliased, sessionmaker
 
-from chorez import models
+from chorez import intervals, models
+from chorez.cache import QueryCache
+from chorez.instrumentation import QueryInstrumentation
+from chorez.profiling import phases
 
 
 @final
 class Database:
-    def __init__(self, database: str, echo: bool = False):
+    def __init__(
+        self,
+        database: str,
+        echo: bool = False,
+        cache_size: int = 0,
+        cache_max_rows: int = 10_000,
+        instrument: bool = False,
+        slow_query_threshold_ms: float | None = None,
+        prevent_overlaps: bool = False,
+        archive: str | None = None,
+    ):
+        """
+        If `cache_size` is greater than zero, results of `list_tasks` and
+        `list_time_entries` are kept in an LRU cache of that many entries.
+        Cached results are shared between callers and should be treated as
+        read-only.
+
+        If `instrument` is set, or a slow query threshold is given, per-statement
+        timings are collected in `self.instrumentation`.
+
+        If `prevent_overlaps` is set, `save_time_entry` refuses entries that
+        overlap an existing one.
+
+        `archive` is the path of the SQLite file that `archive_time_entries`
+        moves old entries to. Once it exists, it is ATTACHed to every
+        connection and `list_time_entries` reads from it when needed.
+        """
+
         self.database: str = database
-        self.engine: sa.Engine = sa.create_engine(
-            f"sqlite:///{self.database}",
-            echo=echo,
-        )
+        self.prevent_overlaps: bool = prevent_overlaps
+        self.archive: str | None = archive
+        self._archive_attached: bool = archive is not None and os.path.exists(archive)
+        with phases.phase("engine"):
+            self.engine: sa.Engine = sa.create_engine(
+                f"sqlite:///{self.database}",
+                echo=echo,
+            )
+
+        self.instrumentation: QueryInstrumentation | None = None
+        if instrument or slow_query_threshold_ms is not None:
+            self.instrumentation = QueryInstrumentation(
+                self.engine, slow_query_threshold_ms
+            )
 
         @event.listens_for(self.engine, "connect")
         def _set_sqlite_pragma(dbapi_conn, connection_record) -> None:  # pyright: ignore[reportUnknownParameterType, reportMissingParameterType]
             cursor = dbapi_conn.cursor()  # pyright: ignore[reportUnknownVariableType, reportUnknownMemberType]
             cursor.execute("PRAGMA foreign_keys=ON")  # pyright: ignore[reportUnknownMemberType]
+            if self._archive_attached:
+                cursor.execute(  # pyright: ignore[reportUnknownMemberType]
+                    f"ATTACH DATABASE ? AS {models.ARCHIVE_SCHEMA}", (self.archive,)
+                )
             cursor.close()  # pyright: ignore[reportUnknownMemberType]
 
         self.Session = sessionmaker(self.engine, expire_on_commit=False)
 
-        models.Base.metadata.create_all(self.engine)
+        with phases.phase("schema"):
+            models.Base.metadata.create_all(self.engine)
+            self._migrate()
+
+        self.cache: QueryCache | None = (
+            QueryCache(cache_size, cache_max_rows) if cache_size > 0 else None
+        )
+        self._changes: int = 0
+        self._version_conn: Any = None  # pyright: ignore[reportExplicitAny]
+
+    def data_version(self) -> int:
+        """
+        Returns SQLite's `PRAGMA data_version` as seen from a dedicated
+        connection. The value changes whenever any other connection, in this
+        process or another one, commits to the database.
+        """
+
+        if self._version_conn is None:
+            self._version_conn = self.engine.raw_connection()
+        cursor = self._version_conn.cursor()  # pyright: ignore[reportAny]
+        try:
+            cursor.execute("PRAGMA data_version")  # pyright: ignore[reportAny]
+            return cursor.fetchone()[0]  # pyright: ignore[reportAny]
+        finally:
+            cursor.close()  # pyright: ignore[reportAny]
+
+    def close(self) -> None:
+        """
+        Releases all connections. The Database stays usable and reconnects
+        lazily.
+        """
+
+        if self._version_conn is not None:
+            self._version_conn.close()  # pyright: ignore[reportAny]
+            self._version_conn = None
+        self.engine.dispose()
+        # A new version connection starts its own data_version sequence.
+        self._changed()
+
+    def _migrate(self) -> None:
+        """
+        Brings databases created by older versions up to date. `create_all`
+        only creates missing tables, not missing indexes or columns.
+        """
+
+        with self.engine.begin() as conn:
+            tasks = models.Task.__table__
+            # Unlike table_info, table_xinfo also lists generated columns.
+            task_columns = {
+                row[1]  # pyright: ignore[reportAny]
+                for row in conn.exec_driver_sql(f"PRAGMA table_xinfo({tasks.name})")
+            }
+            for column in (tasks.c.priority_rank, tasks.c.difficulty_rank):  # pyright: ignore[reportAny]
+                if column.name in task_columns:  # pyright: ignore[reportAny]
+                    continue
+                _ = conn.exec_driver_sql(
+                    f"ALTER TABLE {tasks.name} ADD COLUMN {column.name} INTEGER "  # pyright: ignore[reportAny]
+                    + f"GENERATED ALWAYS AS ({column.computed.sqltext}) VIRTUAL"  # pyright: ignore[reportAny]
+                )
+            if models.Task.created_at.key not in task_columns:
+                _ = conn.exec_driver_sql(
+                    f"ALTER TABLE {models.Task.__tablename__} "
+                    + f"ADD COLUMN {models.Task.created_at.key} DATETIME"
+                )
+
+            self._migrate_time_entry_ids(conn)
+
+            for table in models.Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+
+    def _migrate_time_entry_ids(self, conn: sa.Connection) -> None:
+        """
+        SQLite can't add AUTOINCREMENT to an existing table, so older
+        time_entries tables are rebuilt. The sequence then starts after the
+        highest ID in either database, since archived IDs may be higher
+        than any left in the main database.
+        """
+
+        table = models.TimeEntry.__table__
+        sql: str | None = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (table.name,),
+        ).scalar()
+        if sql is None or "AUTOINCREMENT" in sql.upper():
+            return
 
+        old = f"{table.name}_old"
+        for index in sa.inspect(conn).get_indexes(table.name):
+            _ = conn.exec_driver_sql(f'DROP INDEX "{index["name"]}"')
+        _ = conn.exec_driver_sql(f"ALTER TABLE {table.name} RENAME TO {old}")
+        table.create(conn)  # pyright: ignore[reportAny]
+        columns = ", ".join(f'"{c.name}"' for c in table.columns)  # pyright: ignore[reportAny]
+        _ = conn.exec_driver_sql(
+            f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {old}"
+        )
+        _ = conn.exec_driver_sql(f"DROP TABLE {old}")
+
+        if self._archive_attached:
+            archived = models.archived_time_entries
+            max_id = conn.execute(sa.select(sa.func.max(archived.c.id))).scalar()
+            if max_id is not None:
+                _ = conn.exec_driver_sql(
+                    "DELETE FROM sqlite_sequence WHERE name = ?", (table.name,)
+                )
+                _ = conn.exec_driver_sql(
+                    "INSERT INTO sqlite_sequence (name, seq) "
+                    + f"SELECT ?, max(?, coalesce(max(id), 0)) FROM {table.name}",
+                    (table.name, max_id),
+                )
+
+    def _changed(self) -> None:
+        self._changes += 1
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _scalars[T](self, stmt: sa.Select[tuple[T]]) -> Sequence[T]:
+        if self.cache is None:
+            with self.Session() as session:
+                return session.scalars(stmt).all()
+
+        self.cache.validate((self._changes, self.data_version()))
+        compiled = stmt.compile(self.engine)
+        key = (compiled.string, tuple(sorted(compiled.params.items())))  # pyright: ignore[reportAny]
+        result = self.cache.get(key)
+        if result is None:
+            with self.Session() as session:
+                result = session.scalars(stmt).all()
+            self.cache.put(key, result)
+        return result
+
+    @phases.timed("query")
     def save_task(self, task: models.Task) -> None:
         """
         Saves a task in the database.
@@ -65,7 +241,9 @@ class Database:
             else:
                 _ = session.merge(task)
             session.commit()
+        self._changed()
 
+    @phases.timed("query")
     def list_tasks(
         self,
         filter: str = "",
@@ -74,18 +252,78 @@ class Database:
         if filter:
             stmt = stmt.where(sa.text(filter))
         stmt = stmt.order_by(models.Task.id.desc())
+        return self._scalars(stmt)
+
+    @phases.timed("query")
+    def count_tasks_by_priority(
+        self,
+        filter: str = "",
+    ) -> list[tuple[models.Priority, int]]:
+        """
+        Counts matching tasks per priority with one GROUP BY, most important
+        priority first. Priorities without tasks are left out.
+        """
+
+        stmt = sa.select(models.Task.priority_rank, sa.func.count())
+        if filter:
+            stmt = stmt.where(sa.text(filter))
+        stmt = stmt.group_by(models.Task.priority_rank).order_by(
+            models.Task.priority_rank.desc()
+        )
+        by_rank = {p.rank: p for p in models.Priority}
         with self.Session() as session:
-            return session.scalars(stmt).all()
+            return [(by_rank[rank], count) for rank, count in session.execute(stmt)]
 
+    def iter_tasks_by_priority(
+        self,
+        filter: str = "",
+        batch_size: int = 500,
+    ) -> Iterator[models.Task]:
+        """
+        Streams matching tasks, most important priority first and newest
+        first within a priority, in batches of `batch_size`. The order matches
+        the (priority_rank, id) index, so nothing is sorted in memory.
+        """
+
+        stmt = sa.select(models.Task)
+        if filter:
+            stmt = stmt.where(sa.text(filter))
+        stmt = stmt.order_by(
+            models.Task.priority_rank.desc(), models.Task.id.desc()
+        ).execution_options(yield_per=batch_size)
+        with self.Session() as session:
+            with phases.phase("query"):
+                result = session.scalars(stmt)
+            while True:
+                # Not around the yield, or the caller's time would count too.
+                with phases.phase("query"):
+                    batch = result.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from batch
+
+    @phases.timed("query")
     def clear_tasks(self, filter: str = "") -> int:
         with self.Session() as session:
+            if self._archive_attached:
+                # The foreign key only cascades within the main database.
+                archived = models.archived_time_entries
+                _ = session.execute(
+                    archived.delete().where(
+                        archived.c.task_id.in_(  # pyright: ignore[reportAny]
+                            sa.select(models.Task.id).where(sa.text(filter))
+                        )
+                    )
+                )
             result = session.execute(
                 sa.delete(models.Task).where(sa.text(filter)).returning(models.Task.id)
             )
             deleted = len(result.fetchall())
             session.commit()
-            return deleted
+        self._changed()
+        return deleted
 
+    @phases.timed("query")
     def save_time_entry(self, time_entry: models.TimeEntry) -> None:
         """
         Saves a time entry in the database.
@@ -114,23 +352,271 @@ class Database:
                     if time_entry.id is not None and time_entry.id != existing.id:
                         raise ValueError("ID mismatch")
                     time_entry.id = existing.id
+                    self._check_overlap(session, time_entry)
                     _ = session.merge(time_entry)
                 else:
+                    self._check_overlap(session, time_entry)
                     session.add(time_entry)
             else:
+                self._check_overlap(session, time_entry)
                 _ = session.merge(time_entry)
             session.commit()
+        self._changed()
 
+    @phases.timed("query")
     def list_time_entries(
         self,
         filter: str = "",
+        since: datetime.datetime | None = None,
+        include_archive: bool | None = None,
     ) -> Sequence[models.TimeEntry]:
-        stmt = sa.select(models.TimeEntry)
+        """
+        Lists time entries, optionally only those starting at or after `since`.
+
+        Archived entries are included when the requested range reaches into
+        the archive, unless `include_archive` is False. Note that
+        `Task.time_entries` only ever contains entries from the main database.
+        """
+
+        source = self.time_entries_source(since, include_archive)
+        entity = (
+            models.TimeEntry
+            if source is models.TimeEntry.__table__
+            else aliased(models.TimeEntry, source)
+        )
+        stmt = sa.select(entity)
+        if since is not None:
+            stmt = stmt.where(entity.start >= since)
         if filter:
             stmt = stmt.where(sa.text(filter))
-        stmt = stmt.order_by(models.TimeEntry.start.desc())
-        with self.Session() as session:
-            return session.scalars(stmt).all()
+        stmt = stmt.order_by(entity.start.desc())
+        return self._scalars(stmt)
+
+    @phases.timed("query")
+    def time_entries_source(
+        self,
+        since: datetime.datetime | None = None,
+        include_archive: bool | None = None,
+    ) -> sa.FromClause:
+        """
+        Returns the time entries table, or a UNION ALL of it and the archive
+        if entries starting at or after `since` may have been archived. The
+        result has the id, task_id, start and end columns and is named
+        "time_entries" either way, so raw filters keep working.
+        """
+
+        table = models.TimeEntry.__table__
+        if not self._archive_attached or include_archive is False:
+            return table  # pyright: ignore[reportReturnType]
+
+        archived = models.archived_time_entries
+        if since is not None and include_archive is None:
+            with self.engine.connect() as conn:
+                newest = conn.execute(sa.select(sa.func.max(archived.c.start))).scalar()
+            if newest is None or newest < since:
+                return table  # pyright: ignore[reportReturnType]
+
+        columns = ("id", "task_id", "start", "end")
+        hot = sa.select(*(table.c[c] for c in columns))  # pyright: ignore[reportAny]
+        cold = sa.select(*(archived.c[c] for c in columns))
+        if since is not None:
+            hot = hot.where(table.c.start >= since)  # pyright: ignore[reportAny]
+            cold = cold.where(archived.c.start >= since)
+        return sa.union_all(hot, cold).subquery(table.name)  # pyright: ignore[reportAny]
+
+    @phases.timed("query")
+    def archive_time_entries(
+        self,
+        before: datetime.datetime,
+        batch_size: int = 5_000,
+    ) -> int:
+        """
+        Moves time entries that ended before `before` into the archive, in
+        batches of `batch_size`, each in its own transaction. Returns the
+        number of entries moved.
+        """
+
+        if self.archive is None:
+            raise ValueError("No archive database configured")
+        if not self._archive_attached:
+            self._create_archive()
+
+        table = models.TimeEntry.__table__
+        archived = models.archived_time_entries
+        columns = ("id", "task_id", "start", "end")
+        moved = 0
+        while True:
+            with self.engine.begin() as conn:
+                ids = (
+                    conn.execute(
+                        sa.select(table.c.id)  # pyright: ignore[reportAny]
+                        .where(
+                            table.c.end.is_not(None),  # pyright: ignore[reportAny]
+                            table.c.end < before,  # pyright: ignore[reportAny]
+                        )
+                        .order_by(table.c.id)  # pyright: ignore[reportAny]
+                        .limit(batch_size)
+                    )
+                    .scalars()
+                    .all()
+                )
+                if not ids:
+                    break
+                _ = conn.execute(
+                    archived.insert().from_select(
+                        columns,
+                        sa.select(*(table.c[c] for c in columns)).where(  # pyright: ignore[reportAny]
+                            table.c.id.in_(ids)  # pyright: ignore[reportAny]
+                        ),
+                    )
+                )
+                _ = conn.execute(table.delete().where(table.c.id.in_(ids)))  # pyright: ignore[reportAny]
+            moved += len(ids)
+
+        if moved:
+            self._changed()
+        return moved
+
+    def vacuum(self) -> None:
+        with self.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as conn:
+            _ = conn.exec_driver_sql("VACUUM main")
+
+    def _create_archive(self) -> None:
+        assert self.archive is not None
+        engine = sa.create_engine(f"sqlite:///{self.archive}")
+        with engine.begin() as conn:
+            models.archive_metadata.create_all(
+                conn.execution_options(
+                    schema_translate_map={models.ARCHIVE_SCHEMA: None}
+                )
+            )
+        engine.dispose()
+
+        self.attach_archive()
+
+    @property
+    def attached_archive(self) -> str | None:
+        """
+        The archive's path if it is ATTACHed, which it is once it exists.
+        """
+
+        return self.archive if self._archive_attached else None
+
+    def attach_archive(self) -> None:
+        """
+        Starts ATTACHing the archive to connections, after its file was
+        created.
+        """
+
+        self._archive_attached = True
+        # Pooled connections were opened without the archive attached.
+        self.close()
+
+    @phases.timed("query")
+    def find_overlaps(self) -> list[intervals.Overlap]:
+        """
+        Finds overlapping time entries with a single sweep over all entries in
+        start order.
+        """
+
+        with self.engine.connect() as conn:
+            return list(intervals.find_overlaps(self._interval_rows(conn)))
+
+    @phases.timed("query")
+    def find_gaps(
+        self,
+        min_gap: datetime.timedelta = datetime.timedelta(minutes=1),
+        max_gap: datetime.timedelta = datetime.timedelta(hours=1),
+    ) -> list[intervals.Gap]:
+        """
+        Finds untracked gaps between time entries whose length is within
+        [min_gap, max_gap]. The defaults are meant to catch forgotten timers
+        within a working session, not nights and weekends.
+        """
+
+        with self.engine.connect() as conn:
+            return list(
+                intervals.find_gaps(self._interval_rows(conn), min_gap, max_gap)
+            )
+
+    @phases.timed("query")
+    def fix_overlaps(self) -> list[intervals.Overlap]:
+        """
+        Resolves overlaps by ending the earlier entry when the later one
+        starts, and returns the overlaps that were resolved.
+
+        This is only done when the later entry runs at least as long as the
+        earlier one, so the time cut off is still tracked by the later entry.
+        Entries that lie entirely within another one are left alone, since
+        either of them would lose time; they still show up in
+        `find_overlaps`.
+        """
+
+        fixed = [o for o in self.find_overlaps() if not o.contained]
+        # The sweep pairs each entry with the latest-ending one before it, so
+        # an entry is only ever cut short by one partial overlap.
+        new_ends = {o.first_id: o.start for o in fixed}
+        if not new_ends:
+            return []
+
+        table = models.TimeEntry.__table__
+        with self.engine.begin() as conn:
+            _ = conn.execute(
+                table.update()
+                .where(table.c.id == sa.bindparam("entry_id"))
+                .values(end=sa.bindparam("new_end")),
+                [{"entry_id": i, "new_end": end} for i, end in new_ends.items()],
+            )
+        self._changed()
+        return fixed
+
+    def _interval_rows(self, conn: sa.Connection) -> Iterator[intervals.Row]:
+        stmt = sa.select(
+            models.TimeEntry.id, models.TimeEntry.start, models.TimeEntry.end
+        ).order_by(models.TimeEntry.start, models.TimeEntry.id)
+        yield from conn.execution_options(yield_per=10_000).execute(stmt)  # pyright: ignore[reportReturnType]
+
+    def _check_overlap(
+        self, session: Session, time_entry: models.TimeEntry
+    ) -> None:
+        """
+        Raises ValueError if `time_entry` would overlap another entry.
+
+        Uses two lookups on the start index instead of a scan: the closest
+        entry starting at or before this one, and the first entry starting
+        inside it. This is exact as long as the existing entries don't
+        overlap each other, which holds when the guard is always on.
+        """
+
+        if not self.prevent_overlaps:
+            return
+
+        te = models.TimeEntry
+        others = _ne(te.id, time_entry.id)
+        prev = session.execute(
+            sa.select(te.id, te.end)
+            .where(te.start <= time_entry.start, others)
+            .order_by(te.start.desc())
+            .limit(1)
+        ).first()
+        if prev is not None and (prev.end is None or prev.end > time_entry.start):
+            raise ValueError(f"Time entry overlaps time entry #{prev.id}")
+
+        inside = sa.select(te.id).where(te.start >= time_entry.start, others)
+        if time_entry.end is not None:
+            inside = inside.where(te.start < time_entry.end)
+        following = session.execute(inside.order_by(te.start).limit(1)).first()
+        if following is not None:
+            raise ValueError(f"Time entry overlaps time entry #{following.id}")
+
+
+def _ne(
+    col: InstrumentedAttribute[Any],  # pyright: ignore[reportExplicitAny]
+    val: Any,  # pyright: ignore[reportExplicitAny, reportAny]
+) -> sa.ColumnElement[bool]:
+    return sa.true() if val is None else col != val
 
 
 def _eq(
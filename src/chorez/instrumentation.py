@@ -0,0 +1,158 @@
+import bisect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, final
+
+import sqlalchemy as sa
+from sqlalchemy import event
+
+from chorez.profiling import Phases, phases
+
+logger = logging.getLogger("chorez.sql")
+
+HISTOGRAM_BOUNDS_MS: tuple[float, ...] = (
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+)
+"""
+Upper bounds of the latency histogram buckets. The last bucket catches
+everything slower than the last bound.
+"""
+
+
+@dataclass
+class StatementStats:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    rows: int | None = None
+    """
+    Rows reported by the DBAPI cursor. SQLite only reports these for
+    statements that return no rows, so for SELECT and RETURNING this stays
+    None.
+    """
+    histogram: list[int] = field(
+        default_factory=lambda: [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    )
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def record(self, elapsed_ms: float, rows: int) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if rows >= 0:
+            self.rows = (self.rows or 0) + rows
+        self.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, elapsed_ms)] += 1
+
+
+@final
+class QueryInstrumentation:
+    """
+    Records per-statement timing on an engine using the
+    `before_cursor_execute`/`after_cursor_execute` events.
+
+    If `slow_query_threshold_ms` is set, statements slower than that are logged
+    as warnings on the "chorez.sql" logger.
+
+    Statement time is also credited to the "query" phase of `phases`, so
+    queries issued outside `Database` methods, e.g. straight on the engine,
+    don't show up as part of whatever phase they ran in.
+    """
+
+    def __init__(
+        self,
+        engine: sa.Engine,
+        slow_query_threshold_ms: float | None = None,
+        phases: Phases = phases,
+    ) -> None:
+        self.slow_query_threshold_ms: float | None = slow_query_threshold_ms
+        self.phases: Phases = phases
+        self.statements: dict[str, StatementStats] = {}
+
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(
+        self,
+        conn: sa.Connection,
+        cursor: Any,  # pyright: ignore[reportExplicitAny, reportAny]
+        statement: str,
+        parameters: Any,  # pyright: ignore[reportExplicitAny, reportAny]
+        context: Any,  # pyright: ignore[reportExplicitAny, reportAny]
+        executemany: bool,
+    ) -> None:
+        conn.info.setdefault("chorez_query_start", []).append(time.perf_counter())  # pyright: ignore[reportAny]
+
+    def _after(
+        self,
+        conn: sa.Connection,
+        cursor: Any,  # pyright: ignore[reportExplicitAny, reportAny]
+        statement: str,
+        parameters: Any,  # pyright: ignore[reportExplicitAny, reportAny]
+        context: Any,  # pyright: ignore[reportExplicitAny, reportAny]
+        executemany: bool,
+    ) -> None:
+        start: float = conn.info["chorez_query_start"].pop()  # pyright: ignore[reportAny]
+        elapsed = time.perf_counter() - start
+        self.phases.add("query", elapsed)
+        elapsed_ms = elapsed * 1000
+        stats = self.statements.get(statement)
+        if stats is None:
+            stats = self.statements[statement] = StatementStats()
+        # rowcount is -1, or 0 until fetched, for statements returning rows.
+        rows: int = -1 if cursor.description is not None else cursor.rowcount  # pyright: ignore[reportAny]
+        stats.record(elapsed_ms, rows)
+
+        if (
+            self.slow_query_threshold_ms is not None
+            and elapsed_ms >= self.slow_query_threshold_ms
+        ):
+            logger.warning(
+                "slow query (%.1f ms): %s %r", elapsed_ms, statement, parameters
+            )
+
+    def report(self, limit: int = 10) -> str:
+        by_total = sorted(
+            self.statements.items(), key=lambda e: e[1].total_ms, reverse=True
+        )
+        count = sum(s.count for s in self.statements.values())
+        total = sum(s.total_ms for s in self.statements.values())
+        lines = [f"Queries: {count} statements, {total:.1f} ms"]
+        for statement, stats in by_total[:limit]:
+            rows = f"rows={stats.rows} " if stats.rows is not None else ""
+            lines.append(
+                f"\t{stats.count:>5}x total={stats.total_ms:.1f}ms "
+                + f"mean={stats.mean_ms:.2f}ms max={stats.max_ms:.2f}ms "
+                + f"{rows}hist={_histogram(stats.histogram)}"
+            )
+            lines.append(f"\t\t{' '.join(statement.split())[:200]}")
+        return "\n".join(lines)
+
+
+def _histogram(buckets: list[int]) -> str:
+    parts: list[str] = []
+    for i, n in enumerate(buckets):
+        if n == 0:
+            continue
+        bound = (
+            f"<{HISTOGRAM_BOUNDS_MS[i]:g}"
+            if i < len(HISTOGRAM_BOUNDS_MS)
+            else f">={HISTOGRAM_BOUNDS_MS[-1]:g}"
+        )
+        parts.append(f"{bound}ms:{n}")
+    return "[" + " ".join(parts) + "]"
@@ -0,0 +1,99 @@
+import datetime
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+Row = tuple[int, datetime.datetime, datetime.datetime | None]
+"""
+(id, start, end) of a time entry. An end of None means the entry is active.
+"""
+
+
+@dataclass(frozen=True)
+class Overlap:
+    first_id: int
+    second_id: int
+    start: datetime.datetime
+    end: datetime.datetime | None
+    contained: bool = False
+    """
+    The second entry ends before the first one does, so it lies entirely
+    within the first.
+    """
+
+    def pretty(self) -> str:
+        return f"#{self.first_id} and #{self.second_id} overlap: {self.start} -> {self.end if self.end else 'active'}"
+
+
+@dataclass(frozen=True)
+class Gap:
+    before_id: int
+    after_id: int
+    start: datetime.datetime
+    end: datetime.datetime
+
+    def pretty(self) -> str:
+        return f"gap between #{self.before_id} and #{self.after_id}: {self.start} -> {self.end} ({self.end - self.start})"
+
+
+def find_overlaps(rows: Iterable[Row]) -> Iterator[Overlap]:
+    """
+    Sweeps over `rows`, which must be ordered by start, and yields every entry
+    that starts before the latest-ending entry seen so far has ended.
+
+    Each overlapping entry is reported once, paired with that latest-ending
+    entry.
+    """
+
+    latest: Row | None = None
+    for row in rows:
+        if latest is not None and _before(row[1], latest[2]):
+            yield Overlap(
+                latest[0],
+                row[0],
+                row[1],
+                _min_end(latest[2], row[2]),
+                contained=_before(row[2], latest[2]),
+            )
+        if latest is None or _before(latest[2], row[2]):
+            latest = row
+
+
+def find_gaps(
+    rows: Iterable[Row],
+    min_gap: datetime.timedelta,
+    max_gap: datetime.timedelta,
+) -> Iterator[Gap]:
+    """
+    Sweeps over `rows`, which must be ordered by start, and yields untracked
+    gaps between entries that are at least `min_gap` and at most `max_gap`
+    long.
+    """
+
+    latest: Row | None = None
+    for row in rows:
+        if latest is not None and latest[2] is not None and row[1] >= latest[2]:
+            gap = row[1] - latest[2]
+            if min_gap <= gap <= max_gap:
+                yield Gap(latest[0], row[0], latest[2], row[1])
+        if latest is None or _before(latest[2], row[2]):
+            latest = row
+
+
+def _before(a: datetime.datetime | None, b: datetime.datetime | None) -> bool:
+    """
+    a < b, where None means the entry is still active and never ends.
+    """
+
+    if a is None:
+        return False
+    return b is None or a < b
+
+
+def _min_end(
+    a: datetime.datetime | None, b: datetime.datetime | None
+) -> datetime.datetime | None:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
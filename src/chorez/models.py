@@ -19,6 +19,14 @@ class Difficulty(str, Enum):
     EASY = "easy"
     BREEZE = "breeze"
 
+    @property
+    def rank(self) -> int:
+        """
+        Higher is harder, BREEZE is 0.
+        """
+
+        return _DIFFICULTY_RANKS[self]
+
 
 class Priority(str, Enum):
     CRITICAL = "critical"
@@ -27,6 +35,31 @@ class Priority(str, Enum):
     LOW = "low"
     INSIGNIFICANT = "insignificant"
 
+    @property
+    def rank(self) -> int:
+        """
+        Higher is more important, INSIGNIFICANT is 0.
+        """
+
+        return _PRIORITY_RANKS[self]
+
+
+_DIFFICULTY_RANKS: dict[Difficulty, int] = {
+    d: len(Difficulty) - 1 - i for i, d in enumerate(Difficulty)
+}
+_PRIORITY_RANKS: dict[Priority, int] = {
+    p: len(Priority) - 1 - i for i, p in enumerate(Priority)
+}
+
+
+def _rank_case(column: str, enum: type[Priority] | type[Difficulty]) -> str:
+    """
+    SQL for an enum column's rank. Enums are stored by name.
+    """
+
+    cases = " ".join(f"WHEN '{m.name}' THEN {m.rank}" for m in enum)
+    return f"CASE {column} {cases} ELSE 0 END"
+
 
 class Base(MappedAsDataclass, DeclarativeBase):  # pyright: ignore[reportUnsafeMultipleInheritance]
     """
@@ -42,7 +75,15 @@ class Base(MappedAsDataclass, DeclarativeBase):  # pyright: ignore[reportUnsafeM
         return dict([(c, getattr(self, c)) for c in self.columns])  # pyright: ignore[reportAny]
 
     def toDict(self) -> dict[str, Any]:  # pyright: ignore[reportExplicitAny]
-        return self.columnitems
+        """
+        Columns marked `info={"internal": True}` are left out.
+        """
+
+        return {
+            c.name: getattr(self, c.name)  # pyright: ignore[reportAny]
+            for c in self.__table__.columns  # pyright: ignore[reportAny]
+            if not c.info.get("internal")  # pyright: ignore[reportAny]
+        }
 
 
 @final
@@ -76,6 +117,25 @@ class Task(Base):
         default=Difficulty.MEDIUM,
         nullable=False,
     )
+    priority_rank: Mapped[int] = mapped_column(
+        sa.Computed(_rank_case("priority", Priority), persisted=False),
+        init=False,
+        repr=False,
+        compare=False,
+        info={"internal": True},
+    )
+    """
+    `priority.rank`, generated by SQLite so that ORDER BY and GROUP BY can
+    use the (priority_rank, id) index instead of sorting enum strings. Being
+    generated, it's right no matter who wrote the row.
+    """
+    difficulty_rank: Mapped[int] = mapped_column(
+        sa.Computed(_rank_case("difficulty", Difficulty), persisted=False),
+        init=False,
+        repr=False,
+        compare=False,
+        info={"internal": True},
+    )
     tags: Mapped[list[str]] = mapped_column(
         sa.JSON(),
         default_factory=list,
@@ -100,6 +160,18 @@ class Task(Base):
         nullable=True,
     )
 
+    created_at: Mapped[datetime.datetime | None] = mapped_column(
+        sa.DateTime(),
+        init=False,
+        repr=False,
+        nullable=True,
+        insert_default=datetime.datetime.now,
+        info={"internal": True},
+    )
+    """
+    None for tasks created before this column existed.
+    """
+
     def pretty(self) -> str:
         return f"Task #{self.id} [{self.name}] [Diff: {self.difficulty.value}, Prio: {self.priority.value}]"
 
@@ -112,9 +184,17 @@ class Task(Base):
         return "\n".join(lines)
 
 
+sa.Index("ix_tasks_priority_rank_id", Task.priority_rank, Task.id)
+# Covering index for name prefix completion, see chorez.completion.
+sa.Index("ix_tasks_name_id", Task.name, Task.id)
+
+
 @final
 class TimeEntry(Base):
     __tablename__ = "time_entries"
+    # IDs are never reused, even after the newest entry is deleted, so an
+    # archived entry's ID can't come back for a new one.
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id: Mapped[int | None] = mapped_column(
         primary_key=True,
@@ -134,6 +214,7 @@ class TimeEntry(Base):
         sa.DateTime(),
         nullable=False,
         default_factory=datetime.datetime.now,
+        index=True,
     )
     end: Mapped[datetime.datetime | None] = mapped_column(
         sa.DateTime(),
@@ -163,3 +244,22 @@ class TimeEntry(Base):
         duration = self.duration()
         duration = duration - datetime.timedelta(microseconds=duration.microseconds)
         return f"{start} -> {end if end else 'active'}: {duration}"
+
+
+ARCHIVE_SCHEMA = "archive"
+
+archive_metadata = sa.MetaData()
+archived_time_entries = sa.Table(
+    TimeEntry.__tablename__,
+    archive_metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("task_id", sa.Integer(), nullable=False),
+    sa.Column("start", sa.DateTime(), nullable=False, index=True),
+    sa.Column("end", sa.DateTime(), nullable=True),
+    schema=ARCHIVE_SCHEMA,
+)
+"""
+Closed time entries moved out of the main database by `Database.archive_time_entries`.
+Lives in a separate SQLite file that is ATTACHed as the "archive" schema.
+There is no foreign key to tasks, since those stay in the main database.
+"""
@@ -0,0 +1,82 @@
+import functools
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import final
+
+
+@final
+class Phases:
+    """
+    Accumulates wall time spent in named phases of a chorez invocation.
+
+    Phases may nest; each phase is only credited with its exclusive time, so
+    e.g. the "settings" phase running inside "imports" is not counted twice.
+    """
+
+    def __init__(self) -> None:
+        self.started: float = time.perf_counter()
+        self.totals: dict[str, float] = {}
+        self._local: threading.local = threading.local()
+
+    def _stack(self) -> list[float]:
+        stack: list[float] | None = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        stack = self._stack()
+        start = time.perf_counter()
+        stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            self.totals[name] = self.totals.get(name, 0.0) + elapsed - children
+            if stack:
+                stack[-1] += elapsed
+
+    def add(self, name: str, seconds: float) -> None:
+        """
+        Credits `seconds` measured elsewhere to `name`, taking them out of the
+        enclosing phase like a nested phase would.
+        """
+
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        stack = self._stack()
+        if stack:
+            stack[-1] += seconds
+
+    def timed[**P, R](self, name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+        def decorator(func: Callable[P, R]) -> Callable[P, R]:
+            @functools.wraps(func)
+            def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                with self.phase(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def report(self) -> str:
+        wall = time.perf_counter() - self.started
+        lines = [f"Phase breakdown (total {wall * 1000:.1f} ms):"]
+        accounted = 0.0
+        for name, seconds in self.totals.items():
+            accounted += seconds
+            lines.append(_line(name, seconds, wall))
+        lines.append(_line("other", max(wall - accounted, 0.0), wall))
+        return "\n".join(lines)
+
+
+def _line(name: str, seconds: float, wall: float) -> str:
+    share = seconds / wall * 100 if wall else 0.0
+    return f"\t{name:<12} {seconds * 1000:>9.1f} ms {share:>5.1f}%"
+
+
+phases = Phases()
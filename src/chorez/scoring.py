@@ -0,0 +1,147 @@
+"""
+Ranks tasks for `chorez task next`.
+
+    score = priority_weight * priority_rank
+          + difficulty_weight * difficulty_rank
+          + sum of tag_weights for the task's tags
+          + age_weight * min(age in days, age_cap_days)
+          + recent_weight * hours tracked in the last recent_days
+
+The score is computed in SQL, one priority band at a time, best band first.
+Each band is read off the (priority_rank, id) index and only its top k rows
+come back, via ORDER BY score LIMIT k. Everything but the priority term has a
+known upper bound, so once k tasks are found and no remaining band can beat
+the worst of them, the remaining bands are not queried at all.
+"""
+
+import datetime
+from dataclasses import dataclass
+
+import sqlalchemy as sa
+
+from chorez import models
+from chorez.database import Database
+from chorez.profiling import phases
+from chorez.settings import ScoringSettings
+
+
+@dataclass(frozen=True)
+class ScoredTask:
+    score: float
+    task_id: int
+    name: str
+    priority: models.Priority
+    difficulty: models.Difficulty
+
+    def pretty(self) -> str:
+        return f"{self.score:>8.2f} Task #{self.task_id} [{self.name}] [Diff: {self.difficulty.value}, Prio: {self.priority.value}]"
+
+
+def next_tasks(
+    db: Database,
+    k: int,
+    weights: ScoringSettings,
+    filter: str = "",
+    now: datetime.datetime | None = None,
+) -> list[ScoredTask]:
+    """
+    Returns the `k` highest scoring tasks matching `filter`, best first.
+    """
+
+    if k <= 0:
+        return []
+    now = now or datetime.datetime.now()
+    recent = _recent_hours_stmt(
+        now - datetime.timedelta(days=weights.recent_days), now
+    ).subquery()
+
+    t = models.Task
+    days = sa.func.julianday(sa.literal(now, sa.DateTime())) - sa.func.julianday(
+        t.created_at
+    )
+    age = sa.func.coalesce(sa.func.max(sa.func.min(days, weights.age_cap_days), 0.0), 0.0)
+    score = (
+        weights.priority_weight * t.priority_rank
+        + weights.difficulty_weight * t.difficulty_rank
+        + weights.age_weight * age
+    )
+    if weights.tag_weights:
+        tags = sa.func.json_each(t.tags).table_valued("value")
+        score = score + (
+            sa.select(
+                sa.func.total(sa.case(weights.tag_weights, value=tags.c.value, else_=0.0))
+            )
+            .select_from(tags)
+            .scalar_subquery()
+        )
+    if weights.recent_weight:
+        score = score + weights.recent_weight * sa.func.coalesce(recent.c.hours, 0.0)
+
+    stmt = sa.select(
+        score.label("score"), t.id, t.name, t.priority, t.difficulty
+    ).select_from(t)
+    if weights.recent_weight:
+        stmt = stmt.outerjoin(recent, recent.c.task_id == t.id)
+    if filter:
+        stmt = stmt.where(sa.text(filter))
+    stmt = stmt.order_by(sa.desc("score"), t.id.desc()).limit(k)
+
+    # Upper bound on everything except the priority term. Each part is at
+    # least 0, since some task may have no tags, age or recent time.
+    bound = (
+        max(weights.difficulty_weight * max(m.rank for m in models.Difficulty), 0.0)
+        + sum(w for w in weights.tag_weights.values() if w > 0)
+        + max(weights.age_weight * weights.age_cap_days, 0.0)
+    )
+    if weights.recent_weight > 0:
+        with db.engine.connect() as conn, phases.phase("query"):
+            most = conn.execute(sa.select(sa.func.max(recent.c.hours))).scalar()
+        bound += max(weights.recent_weight * (most or 0.0), 0.0)
+
+    # Best bands first, whichever way the weight points.
+    ranks = sorted(
+        {m.rank for m in models.Priority}, reverse=weights.priority_weight >= 0
+    )
+    top: list[ScoredTask] = []
+    with db.engine.connect() as conn:
+        for rank in ranks:
+            if len(top) == k and weights.priority_weight * rank + bound < top[-1].score:
+                break
+            with phases.phase("query"):
+                rows = conn.execute(stmt.where(t.priority_rank == rank)).all()
+            top.extend(
+                ScoredTask(row.score, row.id, row.name, row.priority, row.difficulty)
+                for row in rows
+            )
+            top.sort(key=lambda task: (task.score, task.task_id), reverse=True)
+            del top[k:]
+
+    return top
+
+
+def recent_hours(
+    db: Database,
+    since: datetime.datetime,
+    now: datetime.datetime,
+) -> dict[int, float]:
+    """
+    Hours tracked per task in entries starting at or after `since`,
+    aggregated in SQL over the time_entries start index.
+    """
+
+    with db.engine.connect() as conn, phases.phase("query"):
+        rows = conn.execute(_recent_hours_stmt(since, now)).all()
+    return {task_id: float(h or 0.0) for task_id, h in rows}
+
+
+def _recent_hours_stmt(
+    since: datetime.datetime, now: datetime.datetime
+) -> sa.Select[tuple[int, float]]:
+    te = models.TimeEntry
+    end = sa.func.coalesce(te.end, sa.literal(now, sa.DateTime()))
+    hours = sa.func.sum(sa.func.julianday(end) - sa.func.julianday(te.start)) * 24
+    return (
+        sa.select(te.task_id, hours.label("hours"))
+        .where(te.start >= since)
+        .group_by(te.task_id)
+    )
@@ -3,6 +3,8 @@ from typing import ClassVar
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from chorez.profiling import phases
+
 
 class DatabaseKind(Enum):
     SQLITE = "sqlite"
@@ -17,6 +19,23 @@ class SqliteDatabaseSettings(BaseSettings):
 
     tasks_table_name: str = "tasks"
 
+    archive_database: str = "sqlite.archive.db"
+    """
+    Where `chorez db archive` moves old time entries to.
+    """
+
+    snapshot_dir: str = "snapshots"
+    """
+    Where `chorez db snapshot` puts its backups.
+    """
+
+    cache_size: int = 0
+    """
+    Number of query results to keep in the in-process LRU cache. 0 disables
+    the cache. Mostly useful for long-lived processes such as statusbars.
+    """
+    cache_max_rows: int = 10_000
+
     model_config: ClassVar[SettingsConfigDict] = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -28,6 +47,18 @@ class DatabaseSettings(BaseSettings):
     kind: DatabaseKind = DatabaseKind.SQLITE
     sqlite: SqliteDatabaseSettings = SqliteDatabaseSettings()
 
+    prevent_time_overlaps: bool = False
+    """
+    Refuse to save time entries that overlap an existing entry, including
+    starting a second timer while one is active.
+    """
+
+    slow_query_threshold_ms: float | None = None
+    """
+    Statements slower than this are logged as warnings on the "chorez.sql"
+    logger. None disables the slow query log.
+    """
+
     model_config: ClassVar[SettingsConfigDict] = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -35,8 +66,50 @@ class DatabaseSettings(BaseSettings):
     )
 
 
+class ScoringSettings(BaseSettings):
+    """
+    Weights for `chorez task next`. Ranks go from 0 (insignificant, breeze)
+    to 4 (critical, challenging).
+    """
+
+    priority_weight: float = 10.0
+    """
+    Per priority rank.
+    """
+
+    difficulty_weight: float = -1.0
+    """
+    Per difficulty rank. Negative prefers easier tasks.
+    """
+
+    tag_weights: dict[str, float] = {}
+    """
+    Added once for each of a task's tags, e.g. '{"work": 5, "garden": -2}'.
+    """
+
+    age_weight: float = 0.2
+    """
+    Per day since the task was created, up to `age_cap_days`.
+    """
+    age_cap_days: float = 30.0
+
+    recent_weight: float = -1.0
+    """
+    Per hour tracked on the task in the last `recent_days` days. Negative
+    rotates away from tasks that already got attention.
+    """
+    recent_days: float = 7.0
+
+    model_config: ClassVar[SettingsConfigDict] = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        env_prefix="CHOREZ_SCORING_",
+    )
+
+
 class Settings(BaseSettings):
     database: DatabaseSettings = DatabaseSettings()
+    scoring: ScoringSettings = ScoringSettings()
 
     model_config: ClassVar[SettingsConfigDict] = SettingsConfigDict(
         env_file=".env",
@@ -45,4 +118,5 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings()
+with phases.phase("settings"):
+    settings = Settings()
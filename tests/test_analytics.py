@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from chorez import models
+from chorez.database import Database
+
+np = pytest.importorskip("numpy")
+
+from chorez import analytics  # noqa: E402
+
+# A Monday
+T0 = datetime(2025, 1, 6, 9, 30, 0)
+
+
+def test_time_stats(tmp_path):
+    db = Database(str(tmp_path / "stats.db"))
+    a = models.Task(name="a", tags=[])
+    b = models.Task(name="b", tags=[])
+    db.save_task(a)
+    db.save_task(b)
+    assert a.id is not None and b.id is not None
+
+    minutes = [10, 20, 30, 40, 100]
+    start = T0
+    for m in minutes:
+        db.save_time_entry(
+            models.TimeEntry(task_id=a.id, start=start, end=start + timedelta(minutes=m))
+        )
+        start += timedelta(days=1)
+    # Crosses midnight from Sunday into Monday.
+    late = datetime(2025, 1, 12, 23, 0, 0)
+    db.save_time_entry(
+        models.TimeEntry(task_id=b.id, start=late, end=late + timedelta(hours=2))
+    )
+
+    stats = analytics.time_stats(db, chunk_size=2)
+
+    by_id = {int(t): i for i, t in enumerate(stats.tasks.task_id)}
+    i = by_id[a.id]
+    assert stats.tasks.count[i] == 5
+    assert stats.tasks.total[i] == pytest.approx(sum(minutes) * 60, abs=1e-3)
+    for q, values in stats.tasks.percentiles.items():
+        expected = np.percentile(np.array(minutes) * 60.0, q)
+        assert values[i] == pytest.approx(expected, abs=1e-3)
+
+    # Monday 09:30-09:40 lands in the 09 bucket.
+    assert stats.heatmap[0, 9] == pytest.approx(600, abs=1e-3)
+    # The Sunday/Monday entry is split across both days.
+    assert stats.heatmap[6, 23] == pytest.approx(3600, abs=1e-3)
+    assert stats.heatmap[0, 0] == pytest.approx(3600, abs=1e-3)
+    assert stats.heatmap.sum() == pytest.approx((sum(minutes) + 120) * 60, abs=1e-2)
+
+    assert len(stats.days) == 8
+    assert stats.rolling_7d[-1] == pytest.approx(
+        stats.daily[-7:].sum(), abs=1e-6
+    )
+    assert stats.to_dict()["daily"][0]["date"] == "2025-01-06"
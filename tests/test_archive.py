@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from chorez import models
+from chorez.database import Database
+
+T0 = datetime(2024, 1, 1, 9, 0, 0)
+
+
+def test_archive_and_transparent_reads(tmp_path):
+    db = Database(str(tmp_path / "hot.db"), archive=str(tmp_path / "cold.db"))
+    t = models.Task(name="long running", tags=[])
+    db.save_task(t)
+    assert t.id is not None
+
+    for day in range(10):
+        start = T0 + timedelta(days=day)
+        db.save_time_entry(
+            models.TimeEntry(task_id=t.id, start=start, end=start + timedelta(hours=1))
+        )
+    db.save_time_entry(models.TimeEntry(task_id=t.id, start=T0 + timedelta(days=20)))
+
+    moved = db.archive_time_entries(T0 + timedelta(days=5), batch_size=2)
+    assert moved == 5
+
+    hot = db.list_time_entries(include_archive=False)
+    assert len(hot) == 6
+    everything = db.list_time_entries()
+    assert len(everything) == 11
+    assert [e.start for e in everything] == sorted(
+        (e.start for e in everything), reverse=True
+    )
+    assert everything[-1].task is not None
+    assert everything[-1].task.id == t.id
+
+    recent = db.list_time_entries(since=T0 + timedelta(days=7))
+    assert len(recent) == 4
+    reaching = db.list_time_entries(since=T0 + timedelta(days=3))
+    assert len(reaching) == 8
+    assert len(db.list_time_entries("end IS NULL")) == 1
+
+    # A fresh instance attaches the existing archive.
+    db.close()
+    db = Database(str(tmp_path / "hot.db"), archive=str(tmp_path / "cold.db"))
+    assert len(db.list_time_entries()) == 11
+    db.close()
+
+
+def test_archive_requires_path(tmp_path):
+    db = Database(str(tmp_path / "hot.db"))
+    with pytest.raises(ValueError, match="archive"):
+        _ = db.archive_time_entries(datetime.now())
+
+
+def test_ids_are_not_reused_after_archiving(tmp_path):
+    db = Database(str(tmp_path / "hot.db"), archive=str(tmp_path / "cold.db"))
+    keep = models.Task(name="kept", tags=[])
+    gone = models.Task(name="deleted", tags=[])
+    db.save_task(keep)
+    db.save_task(gone)
+    assert keep.id is not None and gone.id is not None
+
+    for day, task_id in enumerate((keep.id, keep.id, gone.id)):
+        start = T0 + timedelta(days=day)
+        db.save_time_entry(
+            models.TimeEntry(task_id=task_id, start=start, end=start + timedelta(hours=1))
+        )
+    assert db.archive_time_entries(T0 + timedelta(days=10)) == 3
+
+    # Nothing is left in the main database to keep the highest ID alive.
+    assert db.clear_tasks(f"id={gone.id}") == 1
+    entry = models.TimeEntry(task_id=keep.id, start=T0 + timedelta(days=20))
+    db.save_time_entry(entry)
+    assert entry.id == 4
+
+    entries = db.list_time_entries()
+    assert sorted(e.id for e in entries) == [1, 2, 4]
+    db.close()
+
+
+def test_clear_tasks_deletes_archived_entries(tmp_path):
+    db = Database(str(tmp_path / "hot.db"), archive=str(tmp_path / "cold.db"))
+    keep = models.Task(name="kept", tags=[])
+    gone = models.Task(name="deleted", tags=[])
+    db.save_task(keep)
+    db.save_task(gone)
+    assert keep.id is not None and gone.id is not None
+
+    for day, task_id in enumerate((keep.id, gone.id, gone.id)):
+        start = T0 + timedelta(days=day)
+        db.save_time_entry(
+            models.TimeEntry(task_id=task_id, start=start, end=start + timedelta(hours=1))
+        )
+    db.save_time_entry(models.TimeEntry(task_id=gone.id, start=T0 + timedelta(days=5)))
+    assert db.archive_time_entries(T0 + timedelta(days=10)) == 3
+
+    assert db.clear_tasks("name = 'deleted'") == 1
+    assert [e.task_id for e in db.list_time_entries()] == [keep.id]
+
+    # Entries archived by an earlier instance are found too.
+    db.close()
+    db = Database(str(tmp_path / "hot.db"), archive=str(tmp_path / "cold.db"))
+    assert db.clear_tasks() == 1
+    assert db.list_time_entries() == []
+    db.close()
+
+
+def test_migrate_time_entry_ids(tmp_path):
+    hot, cold = str(tmp_path / "hot.db"), str(tmp_path / "cold.db")
+    db = Database(hot, archive=cold)
+    t = models.Task(name="old", tags=[])
+    db.save_task(t)
+    assert t.id is not None
+    for day in range(3):
+        start = T0 + timedelta(days=day)
+        db.save_time_entry(
+            models.TimeEntry(task_id=t.id, start=start, end=start + timedelta(hours=1))
+        )
+    assert db.archive_time_entries(T0 + timedelta(days=10)) == 3
+    db.close()
+
+    # Recreate the table the way older versions did, without AUTOINCREMENT.
+    # It's empty now, so only the archive knows which IDs were used.
+    with db.engine.begin() as conn:
+        _ = conn.exec_driver_sql("DROP INDEX ix_time_entries_start")
+        _ = conn.exec_driver_sql("DROP TABLE time_entries")
+        _ = conn.exec_driver_sql(
+            "CREATE TABLE time_entries (id INTEGER NOT NULL PRIMARY KEY, "
+            + "task_id INTEGER NOT NULL REFERENCES tasks (id) ON DELETE CASCADE, "
+            + 'start DATETIME NOT NULL, "end" DATETIME)'
+        )
+        _ = conn.exec_driver_sql("DELETE FROM sqlite_sequence")
+    db.close()
+
+    db = Database(hot, archive=cold)
+    with db.engine.connect() as conn:
+        sql: str = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE name = 'time_entries'"
+        ).scalar_one()
+    assert "AUTOINCREMENT" in sql
+
+    entry = models.TimeEntry(task_id=t.id, start=T0 + timedelta(days=30))
+    db.save_time_entry(entry)
+    assert entry.id == 4
+    db.close()
@@ -0,0 +1,154 @@
+import gzip
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from chorez import backup, models
+from chorez.database import Database
+
+T0 = datetime(2025, 1, 1)
+
+
+def _count(path: str) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        return conn.execute("SELECT count(*) FROM time_entries").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_backup_with_concurrent_writers(tmp_path):
+    db = Database(str(tmp_path / "busy.db"))
+    t = models.Task(name="busy", tags=[])
+    db.save_task(t)
+    assert t.id is not None
+    task_id = t.id
+    for i in range(500):
+        start = T0 + timedelta(minutes=i)
+        db.save_time_entry(models.TimeEntry(task_id=task_id, start=start, end=start))
+    before = _count(db.database)
+
+    errors: list[BaseException] = []
+
+    def writer(offset: int) -> None:
+        try:
+            for i in range(100):
+                start = T0 + timedelta(days=offset, minutes=i)
+                db.save_time_entry(models.TimeEntry(task_id=task_id, start=start))
+        except BaseException as e:
+            errors.append(e)
+
+    writers = [threading.Thread(target=writer, args=(n + 1,)) for n in range(2)]
+    for w in writers:
+        w.start()
+    dest = str(tmp_path / "busy-backup.db")
+    digest = backup.backup(db, dest, pages=1, sleep=0.001)
+    for w in writers:
+        w.join()
+
+    assert not errors
+    assert before <= _count(dest) <= before + 200
+    assert _count(db.database) == before + 200
+    with open(f"{dest}.sha256") as f:
+        assert f.read().split() == [digest, "busy-backup.db"]
+
+    # Restoring brings the writes made after the backup back out.
+    backed_up = _count(dest)
+    backup.restore(db, dest)
+    assert len(db.list_time_entries()) == backed_up
+    db.close()
+
+
+def test_compressed_snapshot_and_restore(tmp_path):
+    db = Database(str(tmp_path / "snap.db"))
+    db.save_task(models.Task(name="one", tags=[]))
+
+    snapshots = tmp_path / "snapshots"
+    first = backup.snapshot(db, str(snapshots))
+    with gzip.open(first) as f:
+        assert f.read(16) == b"SQLite format 3\x00"
+
+    db.save_task(models.Task(name="two", tags=[]))
+    rotated = tmp_path / "rotated"
+    for _ in range(3):
+        _ = backup.snapshot(db, str(rotated), keep=2)
+    assert len([p for p in rotated.iterdir() if p.suffix == ".gz"]) == 2
+
+    backup.restore(db, first)
+    assert [t.name for t in db.list_tasks()] == ["one"]
+
+    with open(first, "r+b") as f:
+        _ = f.seek(20)
+        _ = f.write(b"garbage")
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        backup.restore(db, first)
+    db.close()
+
+
+def _archived_db(tmp_path) -> tuple[Database, int]:
+    db = Database(str(tmp_path / "hot.db"), archive=str(tmp_path / "cold.db"))
+    t = models.Task(name="archived", tags=[])
+    db.save_task(t)
+    assert t.id is not None
+    for day in range(6):
+        start = T0 + timedelta(days=day)
+        db.save_time_entry(
+            models.TimeEntry(task_id=t.id, start=start, end=start + timedelta(hours=1))
+        )
+    assert db.archive_time_entries(T0 + timedelta(days=2)) == 2
+    return db, t.id
+
+
+def test_backup_and_restore_archive(tmp_path):
+    db, _ = _archived_db(tmp_path)
+    dest = str(tmp_path / "with-archive.db.gz")
+    _ = backup.backup(db, dest, compress=True)
+    archive_dest = tmp_path / "with-archive.archive.db.gz"
+    assert archive_dest.exists()
+    assert (tmp_path / "with-archive.archive.db.gz.sha256").exists()
+    assert not list(tmp_path.glob("tmp*"))
+
+    assert db.archive_time_entries(T0 + timedelta(days=10)) == 4
+    assert len(db.list_time_entries(include_archive=False)) == 0
+    backup.restore(db, dest)
+    assert len(db.list_time_entries(include_archive=False)) == 4
+    assert len(db.list_time_entries()) == 6
+
+    # A backup without the archive would leave the two out of sync.
+    plain = Database(str(tmp_path / "plain.db"))
+    _ = backup.backup(plain, str(tmp_path / "plain-backup.db"))
+    plain.close()
+    with pytest.raises(ValueError, match="no archive backup"):
+        backup.restore(db, str(tmp_path / "plain-backup.db"))
+
+    snapshots = tmp_path / "snapshots"
+    for _ in range(3):
+        _ = backup.snapshot(db, str(snapshots), keep=2)
+    names = sorted(p.name for p in snapshots.iterdir() if not p.name.endswith(".sha256"))
+    assert len(names) == 4
+    assert len([n for n in names if ".archive." in n]) == 2
+    db.close()
+
+
+def test_backup_retries_when_archiving_runs(tmp_path, monkeypatch):
+    db, _ = _archived_db(tmp_path)
+    write = backup._write  # pyright: ignore[reportPrivateUsage]
+    calls: list[str] = []
+
+    def write_while_archiving(conn, name, dest, *args):
+        calls.append(name)
+        if calls == ["archive", "main"]:
+            # Moves entries out of the main database after the archive was
+            # copied, which would lose them from the backup.
+            _ = db.archive_time_entries(T0 + timedelta(days=10))
+        return write(conn, name, dest, *args)
+
+    monkeypatch.setattr(backup, "_write", write_while_archiving)
+    dest = str(tmp_path / "raced.db")
+    _ = backup.backup(db, dest)
+    assert calls == ["archive", "main", "archive", "main"]
+    assert _count(str(tmp_path / "raced.archive.db")) + _count(dest) == 6
+    db.close()
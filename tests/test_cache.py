@@ -0,0 +1,68 @@
+import sqlite3
+from datetime import datetime
+
+from chorez import models
+from chorez.cache import QueryCache
+from chorez.database import Database
+
+
+def test_lru_bounds():
+    cache = QueryCache(max_entries=2, max_rows=5)
+    cache.put("a", [1, 2])
+    cache.put("b", [3])
+    assert cache.get("a") == [1, 2]
+    cache.put("c", [4])
+    # "b" was least recently used
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    cache.put("d", [5, 6, 7, 8])
+    assert cache.get("a") is None
+    assert cache.get("d") == [5, 6, 7, 8]
+
+    cache.put("huge", list(range(6)))
+    assert cache.get("huge") is None
+    assert cache.stats.evictions == 2
+    assert cache.report() == (
+        "Cache: 2 hits, 3 misses (40.0% hit rate), 2 evictions, "
+        + "0 invalidations, 2 entries holding 5 rows"
+    )
+
+
+def test_cached_results_and_local_invalidation(tmp_path):
+    db = Database(str(tmp_path / "cache.db"), cache_size=8)
+    assert db.cache is not None
+    t = models.Task(name="cached", tags=[])
+    db.save_task(t)
+
+    first = db.list_tasks(f"id={t.id}")
+    second = db.list_tasks(f"id={t.id}")
+    assert first is second
+    assert db.cache.stats.hits == 1
+
+    t.name = "renamed"
+    db.save_task(t)
+    assert db.list_tasks(f"id={t.id}")[0].name == "renamed"
+
+    db.save_time_entry(models.TimeEntry(task_id=t.id, start=datetime.now()))
+    assert len(db.list_time_entries("end IS NULL")) == 1
+    db.close()
+
+
+def test_sees_writes_from_other_connections(tmp_path):
+    db_file = str(tmp_path / "cache.db")
+    db = Database(db_file, cache_size=8)
+    db.save_task(models.Task(name="one", tags=[]))
+    assert len(db.list_tasks()) == 1
+    assert len(db.list_tasks()) == 1
+
+    conn = sqlite3.connect(db_file)
+    _ = conn.execute(
+        "INSERT INTO tasks (name, priority, difficulty, tags, \"desc\", is_imported) "
+        + "VALUES ('two', 'MEDIUM', 'MEDIUM', '[]', '', 0)"
+    )
+    conn.commit()
+    conn.close()
+
+    assert len(db.list_tasks()) == 2
+    db.close()
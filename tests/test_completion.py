@@ -0,0 +1,65 @@
+import io
+import sqlite3
+
+import pytest
+
+from chorez import models
+from chorez.completion import complete
+from chorez.database import Database
+
+
+@pytest.fixture
+def db_file(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "complete.db")
+    monkeypatch.setenv("CHOREZ_DB_SQLITE_DATABASE", db_file)
+    db = Database(db_file)
+    for i in range(1, 131):
+        db.save_task(models.Task(name=f"task {i}", tags=["home"] if i % 2 else ["work"]))
+    db.save_task(models.Task(name="Write report", tags=["work", "writing"]))
+    db.close()
+    return db_file
+
+
+def _complete(*words: str) -> list[str]:
+    out = io.StringIO()
+    assert complete(list(words), out) == 0
+    return out.getvalue().splitlines()
+
+
+def test_task_ids(db_file):
+    assert _complete("task", "edit", "--id", "12") == [
+        "12",
+        *(str(i) for i in range(120, 130)),
+    ]
+    assert _complete("--profile", "time", "start", "13") == ["13", "130", "131"]
+    assert _complete("time", "start", "x") == []
+    assert _complete("time", "start", "0") == []
+    assert _complete("time", "start", "01") == []
+    assert _complete("time", "start", "")[:2] == ["131", "130"]
+    assert _complete("time", "start", "5", "") == []
+
+
+def test_task_names(db_file):
+    assert _complete("task", "edit", "--id", "1", "--name", "Wr") == ["Write report"]
+    assert _complete("task", "edit", "task 10") == [
+        "task 10",
+        *(f"task {i}" for i in range(100, 110)),
+    ]
+
+
+def test_tags(db_file):
+    assert _complete("task", "add", "--name", "x", "--tags", "w") == ["work", "writing"]
+    assert _complete("task", "edit", "-i", "1", "-t", "+home", "-wo") == ["-work"]
+    assert _complete("task", "add", "--tags", "a", "--desc", "w") == []
+
+    conn = sqlite3.connect(db_file)
+    _ = conn.execute("UPDATE tasks SET tags = '[\"wood\"]' WHERE id = 1")
+    conn.commit()
+    conn.close()
+    assert _complete("task", "add", "-t", "woo") == ["wood"]
+
+
+def test_bash_script():
+    assert "complete -o default -F _chorez chorez" in "\n".join(
+        _complete("--shell", "bash")
+    )
@@ -178,3 +178,82 @@ def test_eager_loaded_task_on_time_entry():
     finally:
         if os.path.exists(db_file):
             os.remove(db_file)
+
+
+def test_priority_grouping_and_rank_migration(tmp_path):
+    import sqlite3
+
+    db_file = str(tmp_path / "ranks.db")
+    conn = sqlite3.connect(db_file)
+    _ = conn.execute(
+        "CREATE TABLE tasks (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+        + "priority VARCHAR(13) NOT NULL, difficulty VARCHAR(11) NOT NULL, "
+        + 'tags JSON NOT NULL, "desc" VARCHAR NOT NULL, is_imported BOOLEAN NOT NULL, '
+        + "source_id VARCHAR, source_url VARCHAR)"
+    )
+    _ = conn.execute(
+        "INSERT INTO tasks (name, priority, difficulty, tags, \"desc\", is_imported) "
+        + "VALUES ('old', 'LOW', 'HARD', '[]', '', 0)"
+    )
+    conn.commit()
+    conn.close()
+
+    db = Database(db_file)
+    old = db.list_tasks()[0]
+    assert old.priority_rank == models.Priority.LOW.rank
+    assert old.difficulty_rank == models.Difficulty.HARD.rank
+
+    for name, prio in [
+        ("a", models.Priority.HIGH),
+        ("b", models.Priority.LOW),
+        ("c", models.Priority.CRITICAL),
+        ("d", models.Priority.HIGH),
+    ]:
+        db.save_task(models.Task(name=name, priority=prio, tags=[]))
+
+    assert db.count_tasks_by_priority() == [
+        (models.Priority.CRITICAL, 1),
+        (models.Priority.HIGH, 2),
+        (models.Priority.LOW, 2),
+    ]
+    assert db.count_tasks_by_priority("name != 'old'")[-1] == (models.Priority.LOW, 1)
+    assert [t.name for t in db.iter_tasks_by_priority(batch_size=2)] == [
+        "c",
+        "d",
+        "a",
+        "b",
+        "old",
+    ]
+
+    old.priority = models.Priority.CRITICAL
+    db.save_task(old)
+    assert db.list_tasks("name = 'old'")[0].priority_rank == models.Priority.CRITICAL.rank
+    db.close()
+
+
+def test_ranks_are_generated(tmp_path):
+    import sqlite3
+
+    db_file = str(tmp_path / "generated.db")
+    db = Database(db_file)
+
+    # Rows written without the ORM get the right rank too.
+    conn = sqlite3.connect(db_file)
+    _ = conn.execute(
+        "INSERT INTO tasks (name, priority, difficulty, tags, \"desc\", is_imported) "
+        + "VALUES ('raw', 'CRITICAL', 'BREEZE', '[]', '', 0)"
+    )
+    conn.commit()
+    conn.close()
+    db.save_task(models.Task(name="orm", priority=models.Priority.MEDIUM, tags=[]))
+    assert db.count_tasks_by_priority() == [
+        (models.Priority.CRITICAL, 1),
+        (models.Priority.MEDIUM, 1),
+    ]
+    assert [t.name for t in db.iter_tasks_by_priority()] == ["raw", "orm"]
+
+    task = db.list_tasks("name = 'raw'")[0]
+    assert task.difficulty_rank == models.Difficulty.BREEZE.rank
+    assert "priority_rank" not in task.toDict()
+    assert "difficulty_rank" not in task.toDict()
+    db.close()
@@ -0,0 +1,71 @@
+import logging
+import time
+
+import pytest
+
+from chorez import models
+from chorez.database import Database
+from chorez.instrumentation import QueryInstrumentation
+from chorez.profiling import Phases
+
+
+def test_statement_stats_and_slow_query_log(tmp_path, caplog):
+    db = Database(str(tmp_path / "instr.db"), slow_query_threshold_ms=0)
+    assert db.instrumentation is not None
+
+    with caplog.at_level(logging.WARNING, logger="chorez.sql"):
+        db.save_task(models.Task(name="timed", tags=[]))
+        _ = db.list_tasks()
+        _ = db.list_tasks()
+
+    selects = [
+        stats
+        for statement, stats in db.instrumentation.statements.items()
+        if statement.startswith("SELECT tasks.id")
+        and "ORDER BY tasks.id DESC" in statement
+    ]
+    assert len(selects) == 1
+    assert selects[0].count == 2
+    assert selects[0].rows is None
+    assert sum(selects[0].histogram) == 2
+    with db.engine.begin() as conn:
+        _ = conn.exec_driver_sql("DELETE FROM tasks WHERE name = 'timed'")
+    deletes = [
+        stats
+        for statement, stats in db.instrumentation.statements.items()
+        if statement.startswith("DELETE FROM tasks WHERE name")
+    ]
+    assert [s.rows for s in deletes] == [1]
+    report = db.instrumentation.report()
+    assert "rows=1 " in report
+    assert "rows=0" not in report
+    assert any("slow query" in r.message for r in caplog.records)
+    db.close()
+
+
+def test_phases_are_exclusive():
+    phases = Phases()
+    with phases.phase("outer"):
+        time.sleep(0.01)
+        with phases.phase("inner"):
+            time.sleep(0.02)
+    assert phases.totals["inner"] >= 0.02
+    assert 0.01 <= phases.totals["outer"] < 0.025
+
+
+def test_engine_queries_count_as_query_phase(tmp_path):
+    phases = Phases()
+    db = Database(str(tmp_path / "phases.db"))
+    instrumentation = QueryInstrumentation(db.engine, phases=phases)
+
+    with phases.phase("formatting"):
+        with db.engine.connect() as conn:
+            _ = conn.exec_driver_sql(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 200000) "
+                + "SELECT sum(i) FROM n"
+            ).scalar()
+
+    statements = sum(s.total_ms for s in instrumentation.statements.values()) / 1000
+    assert statements > 0
+    assert phases.totals["query"] == pytest.approx(statements)
+    db.close()
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from chorez import models
+from chorez.cli import time as time_cli
+from chorez.database import Database
+
+T0 = datetime(2025, 1, 6, 9, 0, 0)
+
+
+def _entry(task_id: int, start: int, end: int | None) -> models.TimeEntry:
+    return models.TimeEntry(
+        task_id=task_id,
+        start=T0 + timedelta(minutes=start),
+        end=None if end is None else T0 + timedelta(minutes=end),
+    )
+
+
+def test_find_and_fix_overlaps(tmp_path):
+    db = Database(str(tmp_path / "intervals.db"))
+    t = models.Task(name="overlapping", tags=[])
+    db.save_task(t)
+    assert t.id is not None
+
+    a = _entry(t.id, 0, 60)
+    b = _entry(t.id, 30, 90)
+    c = _entry(t.id, 45, 50)
+    d = _entry(t.id, 100, None)
+    for e in (a, b, c, d):
+        db.save_time_entry(e)
+
+    overlaps = db.find_overlaps()
+    assert [(o.first_id, o.second_id) for o in overlaps] == [
+        (a.id, b.id),
+        (b.id, c.id),
+    ]
+    assert overlaps[0].end == T0 + timedelta(minutes=60)
+
+    gaps = db.find_gaps()
+    assert [(g.before_id, g.after_id) for g in gaps] == [(b.id, d.id)]
+    assert gaps[0].end - gaps[0].start == timedelta(minutes=10)
+
+    # c lies within b, so only a is cut short, and only where b covers it.
+    fixed = db.fix_overlaps()
+    assert [(o.first_id, o.second_id) for o in fixed] == [(a.id, b.id)]
+    assert [(o.first_id, o.second_id) for o in db.find_overlaps()] == [(b.id, c.id)]
+    by_id = {e.id: e for e in db.list_time_entries()}
+    assert by_id[a.id].end == b.start
+    assert by_id[b.id].end == T0 + timedelta(minutes=90)
+    assert by_id[c.id].end == T0 + timedelta(minutes=50)
+
+
+def test_active_timers_overlap(tmp_path):
+    db = Database(str(tmp_path / "intervals.db"))
+    t = models.Task(name="twice", tags=[])
+    db.save_task(t)
+    assert t.id is not None
+    db.save_time_entry(_entry(t.id, 0, None))
+    db.save_time_entry(_entry(t.id, 10, None))
+    assert len(db.find_overlaps()) == 1
+    assert db.find_overlaps()[0].end is None
+
+
+def test_overlap_guard(tmp_path):
+    db = Database(str(tmp_path / "intervals.db"), prevent_overlaps=True)
+    t = models.Task(name="guarded", tags=[])
+    db.save_task(t)
+    assert t.id is not None
+
+    first = _entry(t.id, 0, 60)
+    db.save_time_entry(first)
+    db.save_time_entry(_entry(t.id, 60, 90))
+
+    with pytest.raises(ValueError, match="overlaps"):
+        db.save_time_entry(_entry(t.id, 30, 45))
+    with pytest.raises(ValueError, match="overlaps"):
+        db.save_time_entry(_entry(t.id, -10, 10))
+
+    db.save_time_entry(_entry(t.id, 120, None))
+    with pytest.raises(ValueError, match="overlaps"):
+        db.save_time_entry(_entry(t.id, 150, None))
+
+    # Updating an entry in place doesn't overlap with itself.
+    first.end = T0 + timedelta(minutes=50)
+    db.save_time_entry(first)
+    assert len(db.list_time_entries()) == 3
+
+
+def test_time_start_with_overlap_guard(tmp_path, capsys):
+    # dateparser returns timezone-aware datetimes, the database naive ones.
+    db = Database(str(tmp_path / "intervals.db"), prevent_overlaps=True)
+    t = models.Task(name="guarded", tags=[])
+    db.save_task(t)
+    chorez = SimpleNamespace(db=db)
+
+    def start(*argv: str) -> int:
+        args = time_cli.TimeStart().parse_args([str(t.id), *argv])
+        return args.run(args, chorez)
+
+    assert start("-s", "2025-01-01 09:00", "-e", "2025-01-01 10:00") == 0
+    assert start("-s", "2025-01-01 11:00") == 0
+    assert start("-s", "2025-01-01 09:30", "-e", "2025-01-01 09:45") == 1
+    assert "overlaps" in capsys.readouterr().err
+    assert [e.start for e in db.list_time_entries()] == [
+        datetime(2025, 1, 1, 11, 0),
+        datetime(2025, 1, 1, 9, 0),
+    ]
@@ -0,0 +1,127 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from chorez import models, scoring
+from chorez.database import Database
+from chorez.settings import ScoringSettings
+
+NOW = datetime(2025, 1, 6, 12, 0, 0)
+
+
+def _full_ranking(db: Database, weights: ScoringSettings) -> list[tuple[float, int]]:
+    # Scored in Python, as a reference for the SQL score.
+    recent = scoring.recent_hours(db, NOW - timedelta(days=weights.recent_days), NOW)
+    ranking: list[tuple[float, int]] = []
+    for task in db.list_tasks():
+        assert task.id is not None and task.created_at is not None
+        age = min((NOW - task.created_at).total_seconds() / 86400, weights.age_cap_days)
+        score = (
+            weights.priority_weight * task.priority.rank
+            + weights.difficulty_weight * task.difficulty.rank
+            + sum(weights.tag_weights.get(tag, 0.0) for tag in task.tags)
+            + weights.age_weight * max(age, 0.0)
+            + weights.recent_weight * recent.get(task.id, 0.0)
+        )
+        ranking.append((score, task.id))
+    return sorted(ranking, reverse=True)
+
+
+def test_next_tasks(tmp_path):
+    db = Database(str(tmp_path / "next.db"))
+    rng = random.Random(0)
+    tags = ["work", "home", "garden"]
+    for i in range(200):
+        task = models.Task(
+            name=f"task {i}",
+            priority=rng.choice(list(models.Priority)),
+            difficulty=rng.choice(list(models.Difficulty)),
+            tags=rng.sample(tags, rng.randint(0, 2)),
+        )
+        db.save_task(task)
+        assert task.id is not None
+        with db.engine.begin() as conn:
+            _ = conn.execute(
+                models.Task.__table__.update()
+                .where(models.Task.id == task.id)
+                .values(created_at=NOW - timedelta(days=rng.uniform(0, 60)))
+            )
+        if rng.random() < 0.2:
+            start = NOW - timedelta(days=rng.uniform(0, 10))
+            db.save_time_entry(
+                models.TimeEntry(
+                    task_id=task.id,
+                    start=start,
+                    end=start + timedelta(hours=rng.uniform(0, 5)),
+                )
+            )
+
+    for weights in (
+        ScoringSettings(),
+        ScoringSettings(tag_weights={"work": 15, "garden": -5}, recent_weight=2.0),
+        ScoringSettings(priority_weight=-3.0, difficulty_weight=2.0),
+    ):
+        expected = _full_ranking(db, weights)
+        assert len(expected) == 200
+        for k in (1, 5, 50, 200):
+            top = scoring.next_tasks(db, k, weights, now=NOW)
+            assert [t.task_id for t in top] == [task_id for _, task_id in expected[:k]]
+            assert [t.score for t in top] == pytest.approx([score for score, _ in expected[:k]])
+
+    top = scoring.next_tasks(db, 5, ScoringSettings(), filter="tags LIKE '%\"home\"%'", now=NOW)
+    assert top and all("home" in db.list_tasks(f"id={t.task_id}")[0].tags for t in top)
+    assert scoring.next_tasks(db, 0, ScoringSettings(), now=NOW) == []
+    assert "created_at" not in db.list_tasks()[0].toDict()
+
+
+def test_recent_hours(tmp_path):
+    db = Database(str(tmp_path / "recent.db"))
+    task = models.Task(name="a", tags=[])
+    db.save_task(task)
+    assert task.id is not None
+    db.save_time_entry(
+        models.TimeEntry(task_id=task.id, start=NOW - timedelta(hours=3), end=NOW - timedelta(hours=1))
+    )
+    db.save_time_entry(models.TimeEntry(task_id=task.id, start=NOW - timedelta(minutes=30), end=None))
+    db.save_time_entry(
+        models.TimeEntry(task_id=task.id, start=NOW - timedelta(days=30), end=NOW - timedelta(days=29))
+    )
+
+    hours = scoring.recent_hours(db, NOW - timedelta(days=7), NOW)
+    assert abs(hours[task.id] - 2.5) < 1e-6
+
+
+def test_negative_recent_weight_does_not_stop_early(tmp_path):
+    db = Database(str(tmp_path / "bound.db"))
+    weights = ScoringSettings(
+        priority_weight=1,
+        difficulty_weight=0,
+        age_weight=1,
+        age_cap_days=30,
+        recent_weight=-1,
+    )
+    ids: dict[str, int] = {}
+    for name, priority, age in (
+        ("x", models.Priority.CRITICAL, 0),
+        ("y", models.Priority.HIGH, 30),
+        ("z", models.Priority.LOW, 0),
+    ):
+        task = models.Task(name=name, priority=priority, tags=[])
+        db.save_task(task)
+        assert task.id is not None
+        ids[name] = task.id
+        with db.engine.begin() as conn:
+            _ = conn.execute(
+                models.Task.__table__.update()
+                .where(models.Task.id == task.id)
+                .values(created_at=NOW - timedelta(days=age))
+            )
+    # Only z has recent time, so the recent term's bound is 0, not -40.
+    db.save_time_entry(
+        models.TimeEntry(task_id=ids["z"], start=NOW - timedelta(hours=40), end=NOW)
+    )
+
+    top = scoring.next_tasks(db, 1, weights, now=NOW)
+    assert [t.task_id for t in top] == [ids["y"]]
+    assert top[0].score == pytest.approx(_full_ranking(db, weights)[0][0])
@@ -0,0 +1,55 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from chorez import models
+from chorez.cli import time as time_cli
+from chorez.database import Database
+
+
+def test_watch_requeries_only_on_change(tmp_path, monkeypatch, capsys):
+    db_file = str(tmp_path / "watch.db")
+    db = Database(db_file)
+    t = models.Task(name="watched", tags=[])
+    db.save_task(t)
+    assert t.id is not None
+    db.save_time_entry(
+        models.TimeEntry(task_id=t.id, start=datetime.now() - timedelta(minutes=5))
+    )
+
+    queries = 0
+    list_time_entries = db.list_time_entries
+
+    def counting(*args, **kwargs):
+        nonlocal queries
+        queries += 1
+        return list_time_entries(*args, **kwargs)
+
+    monkeypatch.setattr(db, "list_time_entries", counting)
+
+    sleeps = 0
+
+    def fake_sleep(seconds: float) -> None:
+        nonlocal sleeps
+        sleeps += 1
+        if sleeps == 2:
+            # Another process stops the timer.
+            conn = sqlite3.connect(db_file)
+            _ = conn.execute("UPDATE time_entries SET \"end\" = start")
+            conn.commit()
+            conn.close()
+
+    monkeypatch.setattr(time_cli, "sleep", fake_sleep)
+
+    cmd = time_cli.TimeActive()
+    args = cmd.parse_args(["--watch", "--format", "json", "--ticks", "4"])
+    assert args.run(args, SimpleNamespace(db=db)) == 0
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(lines) == 4
+    assert [len(line) for line in lines] == [1, 1, 0, 0]
+    assert lines[0][0]["task"] == "watched"
+    assert lines[0][0]["elapsed_seconds"] >= 300
+    assert queries == 2
+    db.close()